@@ -0,0 +1,110 @@
+"""
+Message edit coalescing for ReSnout plugins.
+Bursts of Message.edit calls on the same message are merged into a single request so plugins stay under Discord's per-channel rate limits.
+"""
+
+import asyncio
+import time
+
+import discord
+
+
+class _PendingEdit:
+    __slots__ = ("message", "kwargs", "future")
+
+    def __init__(self, message, future):
+        self.message = message
+        self.kwargs = {}
+        self.future = future
+
+
+class EditCoalescer:
+    """
+    Debounce and merge edits per message.
+
+    The first edit of a message goes out on the next loop iteration. Any edit
+    arriving less than `interval` seconds after the previous flush is held and
+    merged with the other pending ones (latest value wins per argument), then
+    sent as one Message.edit. Every caller awaiting a merged edit gets the
+    same edited message back.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        """
+        Args:
+            interval: Minimum delay in seconds between two edits of the same message
+        """
+        self.interval = interval
+        self._pending = {}  # message id: _PendingEdit
+        self._last_flush = {}  # message id: monotonic time of the last edit sent
+        self._tasks = set()  # Scheduled flushes, referenced until done
+
+    @classmethod
+    def for_bot(cls, bot, interval: float = 0.5):
+        """Get the coalescer shared by every plugin of a bot, so all edits of a message go through the same queue."""
+        coalescer = getattr(bot, "_edit_coalescer", None)
+        if coalescer is None:
+            coalescer = cls(interval)
+            bot._edit_coalescer = coalescer
+        return coalescer
+
+    async def edit(self, message: discord.Message, **kwargs):
+        """
+        Queue an edit of a message.
+
+        Args:
+            message: The message to edit
+            **kwargs: Message.edit arguments, merged with the pending ones
+
+        Returns:
+            The edited message, or None if the edit was discarded
+        """
+        pending = self._pending.get(message.id)
+        if pending is None:
+            pending = _PendingEdit(message, asyncio.get_running_loop().create_future())
+            self._pending[message.id] = pending
+
+            elapsed = time.monotonic() - self._last_flush.get(message.id, 0.0)
+            task = asyncio.create_task(self._flush(message.id, max(0.0, self.interval - elapsed)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        pending.message = message
+        pending.kwargs.update(kwargs)
+        # Shield so a cancelled caller does not cancel the edit for the others
+        return await asyncio.shield(pending.future)
+
+    def discard(self, message: discord.Message):
+        """Drop the pending edit of a message (e.g. before deleting it). Its callers get None."""
+        pending = self._pending.pop(message.id, None)
+        if pending and not pending.future.done():
+            pending.future.set_result(None)
+
+    async def _flush(self, message_id, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+
+        pending = self._pending.pop(message_id, None)
+        if pending is None:
+            return  # Discarded meanwhile
+
+        self._last_flush[message_id] = time.monotonic()
+        self._forget_idle()
+        try:
+            result = await pending.message.edit(**pending.kwargs)
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+            # Mark retrieved, callers that stopped waiting must not trigger a warning
+            pending.future.exception()
+        else:
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    def _forget_idle(self):
+        """Drop flush times old enough not to delay anything anymore."""
+        if len(self._last_flush) < 1024:
+            return
+        limit = time.monotonic() - self.interval
+        for message_id in [k for k, t in self._last_flush.items() if t < limit]:
+            del self._last_flush[message_id]
@@ -0,0 +1,56 @@
+"""
+Lightweight runtime metrics for ReSnout plugins.
+Plugins record durations into a LatencyStats and expose its summary however they like (logs, embeds ...).
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class LatencyStats:
+    """Rolling latency statistics over the last `window` samples, plus lifetime totals."""
+
+    def __init__(self, window: int = 1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float):
+        """Record one duration, in seconds."""
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    @contextmanager
+    def measure(self):
+        """Record the duration of the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def percentile(self, p: float) -> float:
+        """Get the p-th percentile (0-100) of the window, in seconds."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def summary(self) -> dict:
+        """Get the statistics, durations in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "max_ms": max(self.samples, default=0.0) * 1000,
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return (
+            f"n={s['count']} mean={s['mean_ms']:.1f}ms "
+            f"p50={s['p50_ms']:.1f}ms p95={s['p95_ms']:.1f}ms max={s['max_ms']:.1f}ms"
+        )
@@ -0,0 +1,174 @@
+"""
+Shared deadline scheduler for ReSnout plugins.
+Inactivity timeouts and other delayed callbacks of every plugin run from a single background task instead of one sleeping task each.
+"""
+
+import asyncio
+import inspect
+import time
+
+
+class _Timer:
+    __slots__ = ("key", "tick", "delay", "callback", "args")
+
+    def __init__(self, key, tick, delay, callback, args):
+        self.key = key
+        self.tick = tick
+        self.delay = delay
+        self.callback = callback
+        self.args = args
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel.
+
+    Time is cut in ticks of `resolution` seconds and a timer lives in the slot
+    of its deadline tick modulo the wheel size, so scheduling, refreshing and
+    cancelling a deadline are O(1) dict operations whatever the number of
+    timers. Deadlines further than one turn stay in their slot until their
+    tick comes. One task advances the wheel once per tick and fires every
+    timer of the slot as one batch; it sleeps without waking up while the
+    wheel is empty.
+
+    Keys are shared by every plugin of the bot, prefix them with the plugin
+    name (e.g. ("cemantix", thread_id)).
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512):
+        """
+        Args:
+            resolution: Duration of a tick in seconds, deadlines fire up to one tick late
+            slots: Number of slots, one turn of the wheel lasts resolution * slots seconds
+        """
+        self.resolution = resolution
+        self._slots = [{} for _ in range(slots)]  # key: _Timer, per deadline tick modulo slots
+        self._timers = {}  # key: _Timer
+        self._tick = self._now()  # Last tick processed
+        self._wakeup = asyncio.Event()  # Set when the first timer of an empty wheel is scheduled
+        self._task = None
+        self._tasks = set()  # Batches of callbacks running, referenced until done
+
+    @classmethod
+    def for_bot(cls, bot, resolution: float = 1.0):
+        """Get the wheel shared by every plugin of a bot, so all their deadlines share one task."""
+        wheel = getattr(bot, "_timer_wheel", None)
+        if wheel is None:
+            wheel = cls(resolution)
+            bot._timer_wheel = wheel
+        return wheel
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def __len__(self):
+        return len(self._timers)
+
+    def _now(self) -> int:
+        return int(time.monotonic() / self.resolution)
+
+    def _place(self, timer: _Timer, delay: float):
+        # First tick starting after the deadline, a timer never fires before its delay
+        # and at most one tick after it
+        timer.tick = int((time.monotonic() + max(delay, 0)) / self.resolution) + 1
+        self._slots[timer.tick % len(self._slots)][timer.key] = timer
+
+    def schedule(self, key, delay: float, callback, *args):
+        """
+        Call `callback(*args)` in `delay` seconds, replacing any timer of the same key.
+
+        Args:
+            key: Hashable identifier of the timer
+            delay: Seconds before the call
+            callback: Function or coroutine function, coroutines run as tasks
+        """
+        self.cancel(key)
+        timer = _Timer(key, 0, delay, callback, args)
+        self._place(timer, delay)
+        self._timers[key] = timer
+
+        if self._task is None or self._task.done():
+            self._tick = self._now()
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def refresh(self, key, delay: float = None) -> bool:
+        """
+        Push back the deadline of a timer.
+
+        Args:
+            key: Identifier of the timer
+            delay: Optional; New delay from now, the one it was scheduled with if omitted
+
+        Returns:
+            bool: False if no timer has this key
+        """
+        timer = self._timers.get(key)
+        if timer is None:
+            return False
+        del self._slots[timer.tick % len(self._slots)][key]
+        if delay is not None:
+            timer.delay = delay
+        self._place(timer, timer.delay)
+        return True
+
+    def cancel(self, key) -> bool:
+        """Drop a timer. Returns False if no timer has this key."""
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._slots[timer.tick % len(self._slots)][key]
+        return True
+
+    def close(self):
+        """Drop every timer and stop the wheel task."""
+        for slot in self._slots:
+            slot.clear()
+        self._timers.clear()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            if not self._timers:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                self._tick = self._now()
+
+            now = self._now()
+            if now > self._tick:
+                # Late wake ups process every tick missed, at most one turn of the wheel
+                expired = []
+                for tick in range(max(self._tick + 1, now - len(self._slots) + 1), now + 1):
+                    slot = self._slots[tick % len(self._slots)]
+                    expired.extend(timer for timer in slot.values() if timer.tick <= now)
+                self._tick = now
+                if expired:
+                    self._fire(expired)
+
+            await asyncio.sleep((self._tick + 1) * self.resolution - time.monotonic())
+
+    def _fire(self, expired: list):
+        coroutines = []
+        for timer in expired:
+            self.cancel(timer.key)
+            try:
+                result = timer.callback(*timer.args)
+            except Exception as e:
+                print(f"❌ Timer {timer.key!r} failed: {e}")
+                continue
+            if inspect.isawaitable(result):
+                coroutines.append((timer.key, result))
+
+        if coroutines:
+            task = asyncio.create_task(self._await_batch(coroutines))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _await_batch(self, coroutines: list):
+        # One task per batch, the wheel keeps ticking while the callbacks wait on Discord
+        results = await asyncio.gather(*(coroutine for _, coroutine in coroutines), return_exceptions=True)
+        for (key, _), result in zip(coroutines, results):
+            if isinstance(result, Exception):
+                print(f"❌ Timer {key!r} failed: {result}")
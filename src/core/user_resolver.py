@@ -0,0 +1,117 @@
+"""
+Shared Discord user lookups for ReSnout plugins.
+Resolves user ids from the gateway cache first, then fetches the missing ones concurrently and keeps them in a bounded cache.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+
+class UserResolver:
+    """
+    Bounded LRU cache of Discord users, with a time to live.
+
+    A lookup is answered by the gateway cache (Client.get_user) when the user
+    shares a guild with the bot, then by the LRU. Only the remaining ids hit
+    the REST API, fetched concurrently (at most `concurrency` requests at a
+    time) and shared with any lookup of the same id already in flight.
+    Unknown users are cached too, so a deleted account is not fetched again
+    on every call.
+    """
+
+    def __init__(self, bot, max_size: int = 4096, ttl: float = 3600.0, concurrency: int = 4):
+        """
+        Args:
+            bot: Discord client used for the lookups
+            max_size: Users kept in the cache, least recently used dropped first
+            ttl: Seconds before a cached user is fetched again (e.g. after a rename)
+            concurrency: REST fetches running at the same time
+        """
+        self.bot = bot
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache = OrderedDict()  # user id: (expiry, discord.User or None), most recently used last
+        self._fetching = {}  # user id: task fetching it, shared by concurrent lookups
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @classmethod
+    def for_bot(cls, bot):
+        """Get the resolver shared by every plugin of a bot, so they share one cache."""
+        resolver = getattr(bot, "_user_resolver", None)
+        if resolver is None:
+            resolver = cls(bot)
+            bot._user_resolver = resolver
+        return resolver
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _cached(self, user_id: int):
+        """Get a cached user as (found, user), dropping it if expired."""
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self._cache[user_id]
+            return False, None
+        self._cache.move_to_end(user_id)
+        return True, entry[1]
+
+    def _store(self, user_id: int, user):
+        self._cache[user_id] = (time.monotonic() + self.ttl, user)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, user_id: int):
+        try:
+            async with self._semaphore:
+                user = await self.bot.fetch_user(user_id)
+        except discord.NotFound:
+            user = None
+        except discord.HTTPException:
+            return None  # Not cached, the next lookup tries again
+        finally:
+            self._fetching.pop(user_id, None)
+        self._store(user_id, user)
+        return user
+
+    async def users(self, user_ids) -> dict:
+        """
+        Resolve several users at once.
+
+        Args:
+            user_ids: Discord ids, as int or str
+
+        Returns:
+            dict: int id: discord.User, or None if the user could not be found
+        """
+        resolved = {}
+        missing = []
+        for user_id in dict.fromkeys(int(user_id) for user_id in user_ids):
+            user = self.bot.get_user(user_id)
+            if user is None:
+                found, user = self._cached(user_id)
+                if not found:
+                    missing.append(user_id)
+                    continue
+            resolved[user_id] = user
+
+        tasks = []
+        for user_id in missing:
+            task = self._fetching.get(user_id)
+            if task is None:
+                task = asyncio.create_task(self._fetch(user_id))
+                self._fetching[user_id] = task
+            tasks.append(task)
+        # Shielded, a cancelled caller does not cancel a fetch shared with others
+        for user_id, user in zip(missing, await asyncio.gather(*(asyncio.shield(t) for t in tasks))):
+            resolved[user_id] = user
+        return resolved
+
+    async def user(self, user_id):
+        """Resolve one user, None if it could not be found."""
+        return (await self.users((user_id,)))[int(user_id)]
@@ -66,4 +66,6 @@ async def on_ready():
         await bot.close()
 
 
-bot.run(BOT_TOKEN)
+# Guarded, process pool workers of the plugins import this module again
+if __name__ == "__main__":
+    bot.run(BOT_TOKEN)
@@ -10,7 +10,9 @@ Check its bio in its .toml companion file.
 import sys
 import os
 import asyncio
+import datetime
 import time
+from pathlib import Path
 
 # Add to python path to use local plugin files dependencies
 sys.path.append(os.path.dirname(__file__))
@@ -18,109 +20,211 @@ sys.path.append(os.path.dirname(__file__))
 import discord
 from discord import app_commands
 from discord.ext import commands
+from core.edit_coalescer import EditCoalescer
+from core.metrics import LatencyStats
+from core.timer_wheel import TimerWheel
 from cemantix_core import GameManager
 from cemantix_view import GameView
+from daily_table import prune_daily, seconds_until_midnight
+from game_session import GameMode, SessionRegistry
+from guess_log import GuessLog
+from word_index import split_words
+from similarity_backend import ExecutorSimilarityBackend, RemoteSimilarityBackend
+from similarity_server import SOCKET_PATH
 from ranking import RankingSystem, PlayerRank
 
+# Words scored at most per message, the others are ignored
+MAX_GUESSES_PER_MESSAGE = 10
+
+# Seconds without a message before a ranked game is closed
+INACTIVITY_TIMEOUT = 300
+
+MODE_LABELS = {
+    GameMode.RANKED: "🏆 Partie classée",
+    GameMode.UNRANKED: "🎲 Partie non classée",
+    GameMode.DAILY: "📅 Mot du jour",
+    GameMode.COOP: "🤝 Partie coopérative",
+}
+
 
 class CemantixGame(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.game = None
+        self.backend = None
+        self.daily_job = None
         try:
-            self.game = GameManager()
             self.view = GameView(bot)
-            self.history = {}
-            self.active_games = {}
-            self.game_timers = {}
-            self.game_start_times = {}
-            self.game_attempts = {}
-            self.game_modes = {}  # Store if game is ranked or not
+            self.sessions = SessionRegistry()
+            self.guess_latency = LatencyStats()  # From a guess to its feedback embed
+            self.edits = EditCoalescer.for_bot(bot)
+            self.timers = TimerWheel.for_bot(bot)
             self.ranking_system = RankingSystem()
+            self.guess_log = GuessLog()  # Every scored guess, for offline tuning
         except Exception as e:
             raise commands.ExtensionFailed("CemantixGame", e)
 
         # Register the message event handler once
         self.bot.event(self.on_message)
 
+    async def cog_load(self):
+        # Loading the vectors touches the disk, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        try:
+            self.game = await loop.run_in_executor(
+                None, GameManager, os.getenv("CEMANTIX_VECTORS", "float32")
+            )
+            await self.ranking_system.load()
+            self.guess_log.open()
+
+            # Share the tables of a similarity server when one runs on this host
+            socket_path = Path(os.getenv("CEMANTIX_SOCKET", SOCKET_PATH))
+            if socket_path.exists():
+                try:
+                    self.backend = await RemoteSimilarityBackend.connect(socket_path)
+                except OSError as e:
+                    print(f"⚠️  Cemantix similarity server unreachable, scoring in-process: {e}")
+            if self.backend is None:
+                self.backend = ExecutorSimilarityBackend(
+                    self.game,
+                    kind=os.getenv("CEMANTIX_EXECUTOR", "thread"),
+                    workers=int(os.getenv("CEMANTIX_WORKERS", "2")),
+                )
+        except Exception as e:
+            raise commands.ExtensionFailed("CemantixGame", e)
+        self.daily_job = asyncio.create_task(self.run_daily_job())
+
+    async def cog_unload(self):
+        if self.daily_job:
+            self.daily_job.cancel()
+        if self.backend:
+            self.backend.close()
+        try:
+            await self.ranking_system.close()
+        finally:
+            await self.guess_log.close()
+
     @app_commands.command(name="cem", description="Démarrer une partie de Cemantix")
     async def cem(self, interaction: discord.Interaction):
         # Create initial embed for game mode selection
         embed = self.view.create_game_mode_embed()
         
         # Create mode selection buttons
-        view, ranked_button, unranked_button = self.view.create_game_mode_buttons()
+        view, ranked_button, unranked_button, daily_button, coop_button = self.view.create_game_mode_buttons()
         
         async def ranked_callback(interaction):
-            await self.start_new_game(interaction, ranked=True)
+            await self.start_new_game(interaction, GameMode.RANKED)
             
         async def unranked_callback(interaction):
-            await self.start_new_game(interaction, ranked=False)
+            await self.start_new_game(interaction, GameMode.UNRANKED)
+
+        async def daily_callback(interaction):
+            await self.start_new_game(interaction, GameMode.DAILY)
+
+        async def coop_callback(interaction):
+            await self.start_new_game(interaction, GameMode.COOP)
             
         ranked_button.callback = ranked_callback
         unranked_button.callback = unranked_callback
+        daily_button.callback = daily_callback
+        coop_button.callback = coop_callback
         
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
-    async def start_new_game(self, interaction: discord.Interaction, ranked: bool = True):
-        # Create a private thread with the user
+    async def run_daily_job(self):
+        """Prepare the table of the daily word at startup, then again at every midnight."""
+        while True:
+            today = datetime.date.today()
+            try:
+                await self.backend.prepare_daily(today, self.game.daily_word(today))
+                prune_daily()
+            except Exception as e:
+                print(f"❌ Cemantix daily word of {today} not prepared: {e}")
+            # A few seconds of margin so the date has changed when waking up
+            await asyncio.sleep(seconds_until_midnight() + 5)
+
+    async def prepare_round(self, mode: GameMode):
+        """
+        Pick the mystery word of a new round and get its table.
+
+        Returns:
+            tuple: (SimilarityTable, difficulty of the word)
+        """
+        if mode is GameMode.DAILY:
+            today = datetime.date.today()
+            word = self.game.daily_word(today)
+            return await self.backend.prepare_daily(today, word), self.game.word_difficulty(word)
+        word, difficulty = self.game.start_new_game()
+        return await self.backend.prepare(word), difficulty
+
+    async def start_new_game(self, interaction: discord.Interaction, mode: GameMode = GameMode.RANKED):
+        user_id = str(interaction.user.id)
+
+        # Create a private thread with the user, or a public one that everyone can join in co-op
         thread = await interaction.channel.create_thread(
-            name=f"Cemantix - {interaction.user.name} #{len([t for t in self.active_games.values() if t.startswith(str(interaction.user.id))]) + 1}",
-            type=discord.ChannelType.private_thread,
+            name=f"Cemantix - {interaction.user.name} #{self.sessions.count_for_user(user_id) + 1}",
+            type=discord.ChannelType.public_thread if mode is GameMode.COOP else discord.ChannelType.private_thread,
         )
         await thread.add_user(interaction.user)
 
-        # Initialize game state for this thread
-        self.history[thread.id] = []
-        self.active_games[thread.id] = str(interaction.user.id)
-        self.game_start_times[thread.id] = time.time()
-        self.game_attempts[thread.id] = 0
-        self.game_modes[thread.id] = ranked  # Store game mode
+        # Initialize game state for this thread and pick its mystery word
+        session = self.sessions.create(thread.id, user_id, mode)
+        session.start(*await self.prepare_round(mode))
 
         # Create initial embeds
         embed = self.view.create_initial_embed()
-        if ranked:
-            embed.add_field(name="Mode", value="🏆 Partie classée", inline=True)
-        else:
-            embed.add_field(name="Mode", value="🎲 Partie non classée", inline=True)
+        embed.add_field(name="Mode", value=MODE_LABELS[mode], inline=True)
             
-        history_embed = self.view.create_history_embed(self.history[thread.id])
+        history_embed = self.view.create_history_embed(session.history)
 
         # Create close button view
         view, close_button = self.view.create_close_button()
 
         async def close_callback(interaction):
-            await interaction.response.send_message(f"Partie abandonnée ! Le mot mystère était : **{self.game.current_mystery_word}**\nLe canal sera supprimé dans 5 secondes...")
+            if await self.deny_non_owner(interaction, session):
+                return
+            await interaction.response.send_message(f"Partie abandonnée ! Le mot mystère était : **{session.mystery_word}**\nLe canal sera supprimé dans 5 secondes...")
             await asyncio.sleep(5)
             await self.close_game(thread.id, interaction.user.id)
 
         close_button.callback = close_callback
 
-        # Send initial messages
-        embed_message = await thread.send(embed=embed, view=view)
-        history_message = await thread.send(embed=history_embed)
+        # Send initial messages and keep their handles for the guesses
+        session.embed_message = await thread.send(embed=embed, view=view)
+        session.history_message = await thread.send(embed=history_embed)
 
-        # Start first game
-        self.game.start_new_game()
-        await interaction.response.send_message(
-            f"Partie créée ! Rendez-vous dans le fil privé {thread.mention}.",
-            ephemeral=True,
-        )
+        if session.coop:
+            await interaction.response.send_message(
+                f"Partie créée ! Rendez-vous dans le fil {thread.mention}, tout le monde peut y participer.",
+                ephemeral=True,
+            )
+        else:
+            await interaction.response.send_message(
+                f"Partie créée ! Rendez-vous dans le fil privé {thread.mention}.",
+                ephemeral=True,
+            )
 
         # Start timer for the game only if it's a ranked game
-        if ranked:
-            self.game_timers[thread.id] = asyncio.create_task(
-                self.close_game_timer(thread.id, interaction.user.id)
-            )
+        if session.ranked:
+            self.start_timer(thread.id, interaction.user.id)
+
+    async def deny_non_owner(self, interaction: discord.Interaction, session) -> bool:
+        """Refuse the game buttons to anyone but the player who started the game, as co-op threads are public."""
+        if str(interaction.user.id) == session.user_id:
+            return False
+        await interaction.response.send_message("Seul le créateur de la partie peut faire cela.", ephemeral=True)
+        return True
 
-    async def close_game_timer(self, thread_id, user_id):
-        await asyncio.sleep(300)  # 5 minutes before auto closing the game
-        await self.close_game(thread_id, user_id)
+    def start_timer(self, thread_id, user_id):
+        """Close the game of a thread after INACTIVITY_TIMEOUT seconds, restarting any running timeout."""
+        self.timers.schedule(("cemantix", thread_id), INACTIVITY_TIMEOUT, self.close_game, thread_id, user_id)
 
     async def close_game(self, thread_id, user_id):
         thread = self.bot.get_channel(thread_id)
+        session = self.sessions.get(thread_id)
         if thread:
             # Calculate game duration
-            start_time = self.game_start_times.get(thread_id)
+            start_time = session.start_time if session else None
             if start_time:
                 end_time = time.time()
                 duration = end_time - start_time
@@ -131,7 +235,7 @@ class CemantixGame(commands.Cog):
                 duration_str = "Temps inconnu"
 
             # Get the number of attempts
-            attempts = self.game_attempts.get(thread_id, 0)
+            attempts = session.attempts if session else 0
 
             # Get the parent channel (where /cem was invoked)
             parent_channel = thread.parent
@@ -151,251 +255,278 @@ class CemantixGame(commands.Cog):
         # Clean up game data
         self.cleanup_game_data(thread_id)
 
+    async def find_game_message(self, channel, title):
+        """Scan the last thread messages for a game embed, only used when a cached handle is stale."""
+        async for m in channel.history(limit=10):
+            if m.embeds and m.embeds[0].title == title:
+                return m
+        return None
+
+    async def edit_game_message(self, session, channel, attr, **kwargs):
+        """
+        Edit one of the game messages of a session and cache the edited message.
+        Edits are coalesced, so a burst of guesses results in a bounded number of requests.
+
+        Args:
+            session: GameSession owning the message
+            channel: The game thread
+            attr: "embed_message" or "history_message"
+            **kwargs: Message.edit arguments
+        """
+        message = getattr(session, attr)
+        if message is not None:
+            try:
+                message = await self.edits.edit(message, **kwargs)
+                setattr(session, attr, message)
+                return message
+            except discord.NotFound:
+                pass
+
+        title = "Cemantix" if attr == "embed_message" else "Historique"
+        message = await self.find_game_message(channel, title)
+        setattr(session, attr, message)
+        if message is not None:
+            message = await self.edits.edit(message, **kwargs)
+            setattr(session, attr, message)
+        return message
+
     async def on_message(self, message):
         """Handle messages in active game threads"""
-        if not message.author.bot and message.channel.id in self.history:
-            thread_id = message.channel.id
-            word = message.content.lower().strip()
-
-            if not self.game.is_word_valid(word):
-                # Get the embed message from the thread
-                messages = [m async for m in message.channel.history(limit=10)]
-                embed_message = next(
-                    (
-                        m
-                        for m in messages
-                        if m.embeds and m.embeds[0].title == "Cemantix"
-                    ),
-                    None,
+        session = self.sessions.get(message.channel.id)
+        if message.author.bot or not session:
+            return
+        user_id = str(message.author.id)
+        # Solo threads only take the guesses of their owner, nor any guess once the word is found
+        if not session.can_guess(user_id) or session.finished:
+            return
+
+        received = time.perf_counter()
+        thread_id = message.channel.id
+        # Co-op embeds name the player behind each guess
+        player = message.author.display_name if session.coop else None
+        # A message can propose several words ("chat chien, souris"), scored in one batch
+        texts = split_words(message.content)[:MAX_GUESSES_PER_MESSAGE]
+        # "Éléphants" is played as "éléphant" instead of being rejected
+        resolved = [(text, self.game.resolve_word(text)) for text in texts]
+        words = list(dict.fromkeys(word for _, word in resolved if word is not None))
+        # The table of the round is read-only, guesses of several players are scored concurrently
+        table = session.table
+        scores = await self.backend.score(table, words) if words else []
+
+        guesses = [(word, *score) for word, score in zip(words, scores) if score is not None]
+        unknown = [text for text, word in resolved if word is None]
+        unknown += [word for word, score in zip(words, scores) if score is None]
+
+        if not guesses:
+            if session.embed_message:
+                embed = session.embed_message.embeds[0]
+                embed = self.view.update_embed_for_invalid_word(
+                    embed, ", ".join(unknown) or message.content.lower().strip()
                 )
+                await self.edit_game_message(session, message.channel, "embed_message", embed=embed)
+            await message.delete()
+            return
 
-                if embed_message:
-                    embed = embed_message.embeds[0]
-                    embed = self.view.update_embed_for_invalid_word(embed, word)
-                    await embed_message.edit(embed=embed)
-                await message.delete()
-                return
+        if not session.embed_message:
+            return
 
-            similarity = self.game.calculate_similarity(word)
-
-            if similarity is None:
-                # Get the embed message from the thread
-                messages = [m async for m in message.channel.history(limit=10)]
-                embed_message = next(
-                    (
-                        m
-                        for m in messages
-                        if m.embeds and m.embeds[0].title == "Cemantix"
-                    ),
-                    None,
-                )
+        # Guesses are counted one message at a time. Embeds are built from the counters
+        # of that message, then edited outside the lock through the edit coalescer
+        async with session.lock:
+            # The word was found, or a new round started, while this message was scored
+            if session.finished or session.table is not table:
+                return
 
-                if embed_message:
-                    embed = embed_message.embeds[0]
-                    embed = self.view.update_embed_for_invalid_word(embed, word)
-                    await embed_message.edit(embed=embed)
-                await message.delete()
+            # Words proposed after the mystery word do not count
+            found = next((i for i, guess in enumerate(guesses) if guess[0] == session.mystery_word), None)
+            if found is not None:
+                guesses = guesses[:found + 1]
+                session.finished = True
+
+            # Every word scored is an attempt, words already proposed are only logged again
+            session.add_attempts(user_id, len(guesses))
+            for word, similarity, _ in guesses:
+                session.history.add(word, similarity)
+            self.guess_log.record(session, str(message.guild.id), user_id, guesses)
+
+            embed = session.embed_message.embeds[0]
+            if len(guesses) == 1 and not unknown:
+                embed = self.view.update_embed_for_similarity(embed, *guesses[0], session.attempts, player)
             else:
-                # Get the embed message from the thread
-                messages = [m async for m in message.channel.history(limit=10)]
-                embed_message = next(
-                    (
-                        m
-                        for m in messages
-                        if m.embeds and m.embeds[0].title == "Cemantix"
-                    ),
-                    None,
+                embed = self.view.update_embed_for_guesses(embed, guesses, session.attempts, unknown, player)
+            history_embed = self.view.create_history_embed(session.history)
+
+            if found is not None:
+                # Calculate game stats for ranking, co-op players are credited with their own attempts
+                duration = time.time() - session.start_time
+                attempts = session.players[user_id] if session.coop else session.attempts
+                players = dict(session.players)
+
+        # Started before another player's message can queue its own edits, so the last counters win
+        await asyncio.gather(
+            self.edit_game_message(session, message.channel, "embed_message", embed=embed),
+            self.edit_game_message(session, message.channel, "history_message", embed=history_embed),
+        )
+        self.guess_latency.record(time.perf_counter() - received)
+
+        # Check if word is correct
+        if found is not None:
+            game_data = {
+                'word': session.mystery_word,
+                'mode': session.mode.value,
+                'accuracy': 1.0,  # Always 1.0 when word is found
+                'attempts': attempts,
+                'time_taken': duration,
+                'difficulty': session.difficulty
+            }
+            # Rankings are kept per guild
+            guild_id = str(message.guild.id)
+
+            # Every finished game goes to the history, for offline ranking replays
+            self.ranking_system.record_game(guild_id, user_id, game_data)
+
+            # Update player ranking only if game is ranked
+            if session.ranked:
+                points, new_rank, rank_changed = self.ranking_system.update_player_rank(
+                    guild_id,
+                    user_id,
+                    game_data
                 )
-                history_message = next(
-                    (
-                        m
-                        for m in messages
-                        if m.embeds and m.embeds[0].title == "Historique"
-                    ),
-                    None,
+
+                # Update embed with ranking information
+                embed = session.embed_message.embeds[0]
+                embed = self.view.update_embed_for_correct_word(embed)
+
+                # Add ranking information to embed only for ranked games
+                embed.add_field(
+                    name="Classement",
+                    value=f"Points gagnés: {points:+d}\nRang actuel: {new_rank}"
+                    + ("\n⭐ Nouveau rang!" if rank_changed else ""),
+                    inline=False
                 )
+            elif session.coop:
+                # Credit the finder, and show how much each player searched
+                embed = session.embed_message.embeds[0]
+                embed = self.view.update_embed_for_correct_word(embed, message.author.mention)
+                embed = self.view.add_players_field(embed, players, user_id)
+            else:
+                # Update embed without ranking information for unranked games
+                embed = session.embed_message.embeds[0]
+                embed = self.view.update_embed_for_correct_word(embed)
 
-                if embed_message:
-                    embed = embed_message.embeds[0]
-                    embed = self.view.update_embed_for_similarity(
-                        embed, word, similarity
-                    )
-                    await embed_message.edit(embed=embed)
-                    await message.delete()
-
-                    # Update history
-                    if any(entry[0] == word for entry in self.history[thread_id]):
-                        # Word already in history, do not add it again
-                        pass
+            # Exact ranks of the round's table, partitioned off the event loop
+            embed = self.view.add_closest_words_field(
+                embed, await self.backend.closest(session.table)
+            )
+
+            # Ask user if they want to close the thread or start a new game
+            view, close_button, new_game_button = (
+                self.view.create_end_game_buttons()
+            )
+
+            async def close_callback(interaction):
+                if await self.deny_non_owner(interaction, session):
+                    return
+                await self.close_game(thread_id, message.author.id)
+
+            async def new_game_callback(interaction):
+                if await self.deny_non_owner(interaction, session):
+                    return
+
+                # Create initial embed for game mode selection
+                embed = self.view.create_game_mode_embed()
+
+                # Create mode selection buttons
+                view, ranked_button, unranked_button, daily_button, coop_button = self.view.create_game_mode_buttons()
+                # Nobody else can join a private thread
+                coop_button.disabled = interaction.channel.type is discord.ChannelType.private_thread
+
+                async def start_round(interaction, mode):
+                    if await self.deny_non_owner(interaction, session):
+                        return
+                    async with session.lock:
+                        session.start(*await self.prepare_round(mode), mode)
+                    embed = self.view.update_embed_for_new_game(self.view.create_initial_embed())
+                    embed.add_field(name="Mode", value=MODE_LABELS[mode], inline=True)
+                    await self.edit_game_message(session, interaction.channel, "embed_message", embed=embed, view=None)
+                    history_embed = self.view.create_history_embed(session.history)
+                    await self.edit_game_message(session, interaction.channel, "history_message", embed=history_embed)
+
+                    # Only ranked games expire
+                    if mode is GameMode.RANKED:
+                        self.start_timer(thread_id, message.author.id)
                     else:
-                        self.history[thread_id].insert(0, (word, similarity))
-                        self.history[thread_id] = self.history[thread_id][
-                            :20
-                        ]  # Keep only the last 20 words
-
-                    # Sort history by similarity (highest first)
-                    self.history[thread_id].sort(key=lambda item: item[1], reverse=True)
-
-                    if history_message:
-                        history_embed = self.view.create_history_embed(
-                            self.history[thread_id]
-                        )
-                        await history_message.edit(embed=history_embed)
-
-                    # Increment attempts
-                    self.game_attempts[thread_id] += 1
-
-                    # Check if word is correct
-                    if word == self.game.current_mystery_word:
-                        # Calculate game stats for ranking
-                        duration = time.time() - self.game_start_times[thread_id]
-                        attempts = self.game_attempts[thread_id]
-                        
-                        # Update player ranking only if game is ranked
-                        if self.game_modes[thread_id]:
-                            game_data = {
-                                'accuracy': 1.0,  # Always 1.0 when word is found
-                                'attempts': attempts,
-                                'time_taken': duration,
-                                'difficulty': 3.0  # Using median difficulty for now
-                            }
-                            
-                            points, new_rank, rank_changed = self.ranking_system.update_player_rank(
-                                str(message.author.id), 
-                                game_data
-                            )
-                            
-                            # Save player data to database
-                            self.ranking_system.save_player(str(message.author.id))
-                            
-                            # Update embed with ranking information
-                            embed = embed_message.embeds[0]
-                            embed = self.view.update_embed_for_correct_word(embed)
-                            
-                            # Add ranking information to embed only for ranked games
-                            embed.add_field(
-                                name="Classement", 
-                                value=f"Points gagnés: {points:+d}\nRang actuel: {new_rank}"
-                                + ("\n⭐ Nouveau rang!" if rank_changed else ""),
-                                inline=False
-                            )
-                        else:
-                            # Update embed without ranking information for unranked games
-                            embed = embed_message.embeds[0]
-                            embed = self.view.update_embed_for_correct_word(embed)
-
-                        # Ask user if they want to close the thread or start a new game
-                        view, close_button, new_game_button = (
-                            self.view.create_end_game_buttons()
-                        )
-
-                        async def close_callback(interaction):
-                            await self.close_game(thread_id, message.author.id)
-
-                        async def new_game_callback(interaction):
-                            # Create initial embed for game mode selection
-                            embed = self.view.create_game_mode_embed()
-                            
-                            # Create mode selection buttons
-                            view, ranked_button, unranked_button = self.view.create_game_mode_buttons()
-                            
-                            async def ranked_callback(interaction):
-                                self.game.start_new_game()
-                                embed = embed_message.embeds[0]
-                                embed = self.view.update_embed_for_new_game(embed)
-                                embed.add_field(name="Mode", value="🏆 Partie classée", inline=True)
-                                await embed_message.edit(embed=embed, view=None)
-                                self.history[thread_id] = []
-                                self.game_modes[thread_id] = True
-                                history_embed = self.view.create_history_embed(self.history[thread_id])
-                                await history_message.edit(embed=history_embed)
-                                
-                                # Start timer for ranked game
-                                if thread_id in self.game_timers:
-                                    self.game_timers[thread_id].cancel()
-                                self.game_timers[thread_id] = asyncio.create_task(
-                                    self.close_game_timer(thread_id, message.author.id)
-                                )
-                                await interaction.response.defer()
-                                
-                            async def unranked_callback(interaction):
-                                self.game.start_new_game()
-                                embed = embed_message.embeds[0]
-                                embed = self.view.update_embed_for_new_game(embed)
-                                embed.add_field(name="Mode", value="🎲 Partie non classée", inline=True)
-                                await embed_message.edit(embed=embed, view=None)
-                                self.history[thread_id] = []
-                                self.game_modes[thread_id] = False
-                                history_embed = self.view.create_history_embed(self.history[thread_id])
-                                await history_message.edit(embed=history_embed)
-                                
-                                # Remove timer for unranked game
-                                if thread_id in self.game_timers:
-                                    self.game_timers[thread_id].cancel()
-                                    del self.game_timers[thread_id]
-                                await interaction.response.defer()
-                            
-                            ranked_button.callback = ranked_callback
-                            unranked_button.callback = unranked_callback
-                            
-                            await embed_message.edit(embed=embed, view=view)
-                            await interaction.response.defer()
-
-                        close_button.callback = close_callback
-                        new_game_button.callback = new_game_callback
-
-                        await embed_message.edit(embed=embed, view=view)
-                        try:
-                            await message.delete()
-                        except discord.errors.NotFound:
-                            pass
-
-                # Reset timer on each message only if game is ranked
-                if thread_id in self.game_timers and self.game_modes[thread_id]:
-                    self.game_timers[thread_id].cancel()
-                    self.game_timers[thread_id] = asyncio.create_task(
-                        self.close_game_timer(thread_id, message.author.id)
-                    )
+                        self.timers.cancel(("cemantix", thread_id))
+                    await interaction.response.defer()
+
+                async def ranked_callback(interaction):
+                    await start_round(interaction, GameMode.RANKED)
+
+                async def unranked_callback(interaction):
+                    await start_round(interaction, GameMode.UNRANKED)
+
+                async def daily_callback(interaction):
+                    await start_round(interaction, GameMode.DAILY)
+
+                async def coop_callback(interaction):
+                    await start_round(interaction, GameMode.COOP)
+
+                ranked_button.callback = ranked_callback
+                unranked_button.callback = unranked_callback
+                daily_button.callback = daily_callback
+                coop_button.callback = coop_callback
+
+                await self.edit_game_message(session, interaction.channel, "embed_message", embed=embed, view=view)
+                await interaction.response.defer()
+
+            close_button.callback = close_callback
+            new_game_button.callback = new_game_callback
+
+            await self.edit_game_message(session, message.channel, "embed_message", embed=embed, view=view)
+
+        try:
+            await message.delete()
+        except discord.errors.NotFound:
+            pass
+
+        # Reset timer on each message only if game is ranked, an O(1) move in the timer wheel
+        if session.ranked:
+            self.timers.refresh(("cemantix", thread_id))
 
     def cleanup_game_data(self, thread_id):
         """Cleans up game data for a given thread_id."""
-        if thread_id in self.history:
-            del self.history[thread_id]
-        if thread_id in self.active_games:
-            del self.active_games[thread_id]
-        if thread_id in self.game_timers:
-            self.game_timers[thread_id].cancel()
-            del self.game_timers[thread_id]
-        if thread_id in self.game_start_times:
-            del self.game_start_times[thread_id]
-        if thread_id in self.game_attempts:
-            del self.game_attempts[thread_id]
-        if thread_id in self.game_modes:
-            del self.game_modes[thread_id]
+        self.sessions.remove(thread_id)
+        self.timers.cancel(("cemantix", thread_id))
 
     @app_commands.command(
         name="cemrank",
         description="Afficher votre classement et les meilleurs joueurs de Cemantix"
     )
     async def cemrank(self, interaction: discord.Interaction):
-        """Display the player's rank and the leaderboard."""
+        """Display the player's rank and the leaderboard of the guild."""
+        if interaction.guild_id is None:
+            await interaction.response.send_message("Le classement est propre à chaque serveur.", ephemeral=True)
+            return
+        guild_id = str(interaction.guild_id)
         player_id = str(interaction.user.id)
         
         # Get player stats
-        player_stats = self.ranking_system.get_player_stats(player_id)
+        player_stats = self.ranking_system.get_player_stats(guild_id, player_id)
         
         # Get nearby players
-        nearby_players = self.ranking_system.get_nearby_players(player_id, range=1)
+        nearby_players = self.ranking_system.get_nearby_players(guild_id, player_id, range=1)
         
         # Get top players
-        top_players = self.ranking_system.get_top_players(limit=3)
+        top_players = self.ranking_system.get_top_players(guild_id, limit=3)
         
         # Create and send the ranking embed
         embed = await self.view.create_ranking_embed(
             player_id=player_id,
             player_data=player_stats,
             nearby_players=nearby_players,
-            top_players=top_players
+            top_players=top_players,
+            guild_id=guild_id,
+            version=self.ranking_system.guild(guild_id).leaderboard.version
         )
 
         await interaction.response.send_message(embed=embed)
@@ -407,23 +538,47 @@ class CemantixGame(commands.Cog):
     async def cemquit(self, interaction: discord.Interaction):
         """Quit the current Cemantix game."""
         # Check if the user has an active game
-        thread_id = None
-        for tid, user_id in self.active_games.items():
-            if user_id == str(interaction.user.id):
-                thread_id = tid
-                break
+        sessions = self.sessions.for_user(str(interaction.user.id))
 
-        if thread_id is None:
+        if not sessions:
             await interaction.response.send_message("Vous n'avez pas de partie en cours.", ephemeral=True)
             return
 
         # Get the thread
+        session = sessions[0]
+        thread_id = session.thread_id
         thread = self.bot.get_channel(thread_id)
         if thread is None:
             await interaction.response.send_message("Impossible de trouver votre partie.", ephemeral=True)
             return
 
         # Send abandon message and close the game
-        await interaction.response.send_message(f"Partie abandonnée ! Le mot mystère était : **{self.game.current_mystery_word}**\nLe canal sera supprimé dans 5 secondes...")
+        await interaction.response.send_message(f"Partie abandonnée ! Le mot mystère était : **{session.mystery_word}**\nLe canal sera supprimé dans 5 secondes...")
         await asyncio.sleep(5)
         await self.close_game(thread_id, interaction.user.id)
+
+    @app_commands.command(
+        name="cemstats",
+        description="Afficher les métriques du moteur de similarité de Cemantix"
+    )
+    async def cemstats(self, interaction: discord.Interaction):
+        """Display the similarity backend metrics, to size its worker pool."""
+        stats = self.backend.stats()
+        wait, latency = stats["wait"], stats["latency"]
+        guess = self.guess_latency.summary()
+        flush = self.ranking_system.flush_latency.summary()
+        await interaction.response.send_message(
+            "```\n"
+            f"Exécuteur     : {stats['executor']} x{stats['workers']}\n"
+            f"Vecteurs      : {stats['precision']}\n"
+            f"Données       : build {self.game.manifest['version']}\n"
+            f"File d'attente: {stats['pending']}\n"
+            f"Attente       : p50 {wait['p50_ms']:.1f} ms | p95 {wait['p95_ms']:.1f} ms\n"
+            f"Calcul        : p50 {latency['p50_ms']:.1f} ms | p95 {latency['p95_ms']:.1f} ms | max {latency['max_ms']:.1f} ms\n"
+            f"Tables        : {latency['count']} calculées, {len(self.backend.tables)} en mémoire\n"
+            f"Parties       : {len(self.sessions)} en cours\n"
+            f"Réponse       : p50 {guess['p50_ms']:.1f} ms | p95 {guess['p95_ms']:.1f} ms\n"
+            f"Sauvegardes   : p50 {flush['p50_ms']:.1f} ms | max {flush['max_ms']:.1f} ms | dernier lot {self.ranking_system.last_batch_size}\n"
+            "```",
+            ephemeral=True,
+        )
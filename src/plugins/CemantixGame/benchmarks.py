@@ -0,0 +1,497 @@
+"""
+Micro-benchmarks for the Cemantix game plugin. They run offline, without Discord.
+
+Usage: python benchmarks.py <benchmark> [options]
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+import tracemalloc
+
+# Add to python path to use local plugin files dependencies
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
+
+
+def _print_latency(label: str, elapsed: float, count: int):
+    print(f"{label:<32} {elapsed / count * 1e9:>10.0f} ns/op ({count} ops)")
+
+
+def bench_sessions(args):
+    """Memory per session and lookup latency of the session registry."""
+    from game_session import GameMode, SessionRegistry
+
+    registry = SessionRegistry()
+    thread_ids = random.sample(range(10**17, 10**18), args.sessions)
+    user_ids = [str(random.randrange(10**17, 10**18)) for _ in range(args.sessions // 3 or 1)]
+
+    owners = [random.choice(user_ids) for _ in thread_ids]
+    start = time.perf_counter()
+    for thread_id, user_id in zip(thread_ids, owners):
+        registry.create(thread_id, user_id, GameMode.RANKED)
+    create_elapsed = time.perf_counter() - start
+    for thread_id in thread_ids:
+        registry.remove(thread_id)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for thread_id, user_id in zip(thread_ids, owners):
+        session = registry.create(thread_id, user_id, GameMode.RANKED)
+        for i in range(args.history):
+            session.history.add(f"mot{i}", random.randint(-1000, 1000))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{'sessions':<32} {len(registry):>10}")
+    print(f"{'memory per session':<32} {(after - before) / len(registry):>10.0f} B (history of {args.history} words)")
+    _print_latency("create", create_elapsed, args.sessions)
+
+    lookups = [random.choice(thread_ids) for _ in range(args.lookups)]
+    start = time.perf_counter()
+    for thread_id in lookups:
+        registry.get(thread_id)
+    _print_latency("get by thread", time.perf_counter() - start, args.lookups)
+
+    start = time.perf_counter()
+    for user_id in user_ids:
+        registry.for_user(user_id)
+    _print_latency("get by player", time.perf_counter() - start, len(user_ids))
+
+    start = time.perf_counter()
+    for thread_id in thread_ids:
+        registry.remove(thread_id)
+    _print_latency("remove", time.perf_counter() - start, args.sessions)
+
+
+# Queries /cemrank ran before the in-memory leaderboard, kept as the baseline
+_SQL_PLAYER_RANK = """
+    SELECT COUNT(*) + 1 FROM player_rankings
+    WHERE points > (SELECT points FROM player_rankings WHERE discord_id = ?)
+"""
+_SQL_NEARBY_PLAYERS = """
+    WITH player_rank AS (
+        SELECT ROW_NUMBER() OVER (ORDER BY points DESC) as rank, discord_id, points
+        FROM player_rankings
+    ),
+    target_rank AS (SELECT rank FROM player_rank WHERE discord_id = ?)
+    SELECT rank, discord_id, points FROM player_rank
+    WHERE rank BETWEEN (SELECT rank FROM target_rank) - 1 AND (SELECT rank FROM target_rank) + 1
+"""
+
+
+def bench_leaderboard(args):
+    """Rank, neighbours and top-N latency of the in-memory leaderboard against the former SQL queries."""
+    import sqlite3
+    from leaderboard import Leaderboard
+
+    def random_points():
+        # New players all start at 0, most of a guild may never have won
+        return 0 if random.random() < tied else int(random.expovariate(1 / 800))
+
+    # Every size is measured with spread scores, then with most players tied
+    for size, tied in [(size, tied) for size in args.sizes for tied in dict.fromkeys((0.0, args.tied))]:
+        ids = [str(random.randrange(10**17, 10**18)) for _ in range(size)]
+        points = [random_points() for _ in range(size)]
+
+        board = Leaderboard()
+        start = time.perf_counter()
+        for pid, pts in zip(ids, points):
+            board.update(pid, pts)
+        build = time.perf_counter() - start
+
+        print(f"--- {size} players, {tied:.0%} tied at 0 points (built in {build:.2f}s)")
+        probes = random.sample(ids, min(args.queries, size))
+
+        start = time.perf_counter()
+        for pid in probes:
+            board.update(pid, random_points())
+        _print_latency("update", time.perf_counter() - start, len(probes))
+
+        start = time.perf_counter()
+        for pid in probes:
+            board.rank(pid)
+        _print_latency("rank", time.perf_counter() - start, len(probes))
+
+        start = time.perf_counter()
+        for pid in probes:
+            board.around(pid, 1)
+        _print_latency("around (k=1)", time.perf_counter() - start, len(probes))
+
+        start = time.perf_counter()
+        for _ in probes:
+            board.top(3)
+        _print_latency("top 3", time.perf_counter() - start, len(probes))
+
+        if args.sql:
+            conn = sqlite3.connect(":memory:")
+            conn.execute("CREATE TABLE player_rankings (discord_id TEXT PRIMARY KEY, points INTEGER)")
+            conn.execute("CREATE INDEX idx_points ON player_rankings (points DESC)")
+            conn.executemany("INSERT INTO player_rankings VALUES (?, ?)", zip(ids, points))
+            sql_probes = probes[:10]
+
+            start = time.perf_counter()
+            for pid in sql_probes:
+                conn.execute(_SQL_PLAYER_RANK, (pid,)).fetchone()
+            _print_latency("sql rank", time.perf_counter() - start, len(sql_probes))
+
+            start = time.perf_counter()
+            for pid in sql_probes:
+                conn.execute(_SQL_NEARBY_PLAYERS, (pid,)).fetchall()
+            _print_latency("sql nearby", time.perf_counter() - start, len(sql_probes))
+            conn.close()
+
+
+def bench_replay(args):
+    """Vectorized ranking replay against replaying every game through PlayerRank."""
+    from ranking import PlayerRank
+    from ranking_replay import replay
+
+    player_ids = [str(random.randrange(args.players)) for _ in range(args.games)]
+    attempts = [int(random.lognormvariate(3.5, 0.8)) + 1 for _ in range(args.games)]
+    durations = [random.uniform(30, 7200) for _ in range(args.games)]
+    accuracy = [1.0] * args.games
+    difficulty = [3.0] * args.games
+
+    start = time.perf_counter()
+    replay(player_ids, accuracy, attempts, durations, difficulty)
+    elapsed = time.perf_counter() - start
+    print(f"--- {args.games} games, {args.players} players")
+    _print_latency("vectorized replay", elapsed, args.games)
+
+    if args.sequential:
+        players = {}
+        start = time.perf_counter()
+        for pid, att, duration in zip(player_ids, attempts, durations):
+            player = players.setdefault(pid, PlayerRank())
+            S = player.calculate_performance_score(1.0, att, duration, 3.0)
+            points = player.calculate_elo(1.0, att, duration, 3.0)
+            player.shadow_mmr = player.shadow_mmr * 0.95 + S * 0.05
+            player.update_rank(points)
+        _print_latency("sequential PlayerRank", time.perf_counter() - start, args.games)
+
+
+def bench_players(args):
+    """Time and memory to load the players of a guild into PlayerRank records and the leaderboard."""
+    from ranking import GuildRanking
+
+    rows = [
+        (str(random.randrange(10**17, 10**18)), "BRONZE", 2, int(random.expovariate(1 / 800)), 0.4, 5)
+        for _ in range(args.players)
+    ]
+
+    start = time.perf_counter()
+    GuildRanking().load(rows)
+    elapsed = time.perf_counter() - start
+
+    # Traced separately, tracemalloc slows allocations down
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    guild = GuildRanking()
+    guild.load(rows)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"--- {args.players} players")
+    print(f"{'load':<32} {elapsed:>10.2f} s")
+    print(f"{'memory per player':<32} {(after - before) / args.players:>10.0f} B")
+
+
+def bench_quantization(args):
+    """Memory and per-mille score error of the quantized vectors against float32, over the whole mystery list."""
+    import numpy as np
+    from embedding_store import EmbeddingStore
+    from build_assets import read_word_list, MYSTERY_PATH
+
+    baseline = EmbeddingStore.load()
+    rows = np.array([baseline.index[w] for w in read_word_list(MYSTERY_PATH) if w in baseline])
+    print(f"--- {len(rows)} mystery words against {len(baseline)} words")
+    print(f"{'float32 vectors':<32} {baseline.vectors.nbytes / 2**20:>10.1f} MiB")
+
+    for precision in ("float16", "int8"):
+        store = EmbeddingStore.load(precision=precision)
+        size = store.vectors.nbytes + (store.scales.nbytes if store.scales is not None else 0)
+        print(f"{precision + ' vectors':<32} {size / 2**20:>10.1f} MiB")
+
+        errors = np.zeros(2001, dtype=np.int64)  # Histogram of score differences, offset by 1000
+        elapsed = 0.0
+        for start in range(0, len(rows), args.batch):
+            batch = rows[start:start + args.batch]
+            # Truncated like SimilarityTable scores
+            expected = (baseline.dot(baseline.rows(batch).T) * 1000).astype(np.int16)
+            begin = time.perf_counter()
+            scores = (store.dot(store.rows(batch).T) * 1000).astype(np.int16)
+            elapsed += time.perf_counter() - begin
+            errors += np.bincount((scores.astype(np.int32) - expected).ravel() + 1000, minlength=2001)
+
+        deltas = np.abs(np.arange(-1000, 1001))
+        total = errors.sum()
+        print(f"{precision + ' mean |error|':<32} {(errors * deltas).sum() / total:>10.4f} ‰")
+        print(f"{precision + ' max |error|':<32} {deltas[errors > 0].max():>10d} ‰")
+        print(f"{precision + ' scores changed':<32} {errors[deltas > 0].sum() / total:>10.2%}")
+        _print_latency(f"{precision} table product", elapsed, len(rows))
+
+
+def bench_words(args):
+    """Build time, memory and lookup latency of the accent and inflection tolerant dictionary index."""
+    from build_assets import read_word_list, DICTIONARY_PATH
+    from word_index import WordIndex, normalize
+
+    words = read_word_list(DICTIONARY_PATH)
+    tracemalloc.start()
+    baseline = set(words)
+    plain = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    index = WordIndex(words)
+    build = time.perf_counter() - start
+    total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"--- {len(index)} dictionary words (built in {build * 1e3:.1f} ms)")
+    print(f"{'plain set':<32} {plain / 1024:>10.0f} KiB")
+    print(f"{'word index (frozenset + keys)':<32} {(total - plain) / 1024:>10.0f} KiB")
+
+    sample = random.sample(words, min(args.lookups, len(words)))
+    inputs = {
+        "exact": sample,
+        "accent-less": [normalize(word) for word in sample],
+        "plural": [word + "s" for word in sample],
+        "unknown": [word + "zq" for word in sample],
+    }
+    start = time.perf_counter()
+    for word in sample:
+        word in baseline
+    _print_latency("set membership", time.perf_counter() - start, len(sample))
+    for label, texts in inputs.items():
+        start = time.perf_counter()
+        resolved = [index.resolve(text) for text in texts]
+        _print_latency(f"resolve {label}", time.perf_counter() - start, len(texts))
+        print(f"{'  matched':<32} {sum(r is not None for r in resolved) / len(texts):>10.1%}")
+
+
+def bench_rpc(args):
+    """Round trips of the similarity server client, one by one and pipelined, checked against in-process tables."""
+    import asyncio
+    import multiprocessing
+    import tempfile
+    from pathlib import Path
+    from embedding_store import EmbeddingStore
+    from similarity_backend import RemoteSimilarityBackend
+    from similarity_server import SimilarityServer
+    from similarity_table import SimilarityTable
+
+    store = EmbeddingStore.load()
+    targets = random.sample(store.words, args.targets)
+    guesses = [random.sample(store.words, args.batch) for _ in range(args.requests)]
+
+    # The server runs in its own process, like next to real bot processes
+    socket_path = Path(tempfile.mkdtemp()) / "similarity.sock"
+    server = multiprocessing.get_context("fork").Process(
+        target=lambda: asyncio.run(SimilarityServer(store, socket_path).serve()), daemon=True
+    )
+    server.start()
+
+    async def run():
+        while not socket_path.exists():
+            await asyncio.sleep(0.01)
+        client = await RemoteSimilarityBackend.connect(socket_path)
+        tables = [await client.prepare(target) for target in targets]
+
+        expected = SimilarityTable.build(store, targets[0])
+        scores = await client.score(tables[0], guesses[0])
+        assert scores == [expected.lookup(word) for word in guesses[0]], "Server and in-process scores differ"
+
+        start = time.perf_counter()
+        for i, words in enumerate(guesses):
+            await client.score(tables[i % len(tables)], words)
+        _print_latency(f"sequential score ({args.batch} words)", time.perf_counter() - start, len(guesses))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client.score(tables[i % len(tables)], words) for i, words in enumerate(guesses)))
+        _print_latency(f"pipelined score ({args.batch} words)", time.perf_counter() - start, len(guesses))
+        client.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.terminate()
+
+
+def bench_timers(args):
+    """Inactivity timeout refreshes, one sleeping task per game against the shared timer wheel."""
+    import asyncio
+    from core.timer_wheel import TimerWheel
+
+    async def expire():
+        await asyncio.sleep(300)
+
+    async def run():
+        games = [random.randrange(args.games) for _ in range(args.refreshes)]
+
+        tasks = {game: asyncio.create_task(expire()) for game in range(args.games)}
+        start = time.perf_counter()
+        for game in games:
+            tasks[game].cancel()
+            tasks[game] = asyncio.create_task(expire())
+        await asyncio.sleep(0)  # Let the cancelled tasks unwind, as the event loop would
+        _print_latency("task cancel + create", time.perf_counter() - start, len(games))
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.sleep(0)
+
+        wheel = TimerWheel()
+        for game in range(args.games):
+            wheel.schedule(game, 300, expire)
+        start = time.perf_counter()
+        for game in games:
+            wheel.refresh(game)
+        _print_latency("wheel refresh", time.perf_counter() - start, len(games))
+        wheel.close()
+
+    asyncio.run(run())
+
+
+def bench_feedback(args):
+    """Guess-to-feedback latency and REST calls per guess, history scans against cached messages and coalesced edits."""
+    import asyncio
+    from core.edit_coalescer import EditCoalescer
+    from core.metrics import LatencyStats
+
+    calls = {"history": 0, "edit": 0}
+
+    class FakeMessage:
+        def __init__(self, message_id: int):
+            self.id = message_id
+
+        async def edit(self, **kwargs):
+            calls["edit"] += 1
+            await asyncio.sleep(args.rtt)
+            return self
+
+    class FakeThread:
+        """Game thread whose REST calls each take one round trip, the game messages are its oldest."""
+
+        def __init__(self):
+            self.messages = [FakeMessage(i) for i in range(10)]  # Newest first, like history()
+
+        async def history(self, limit: int):
+            calls["history"] += 1
+            await asyncio.sleep(args.rtt)
+            for message in self.messages[:limit]:
+                yield message
+
+    async def scanned_guess(thread):
+        # Former on_message: find both game messages in the history, then edit them one after the other
+        messages = [m async for m in thread.history(limit=10)]
+        embed_message, history_message = messages[-1], messages[-2]
+        await embed_message.edit(embed=None)
+        await history_message.edit(embed=None)
+
+    async def cached_guess(thread):
+        # Messages kept by the session, edited directly
+        await asyncio.gather(thread.messages[-1].edit(embed=None), thread.messages[-2].edit(embed=None))
+
+    async def coalesced_guess(thread, edits):
+        # Current on_message: messages kept by the session, both edits queued at once
+        await asyncio.gather(
+            edits.edit(thread.messages[-1], embed=None),
+            edits.edit(thread.messages[-2], embed=None),
+        )
+
+    async def run(gap: float, handle):
+        latency = LatencyStats()
+
+        async def guess():
+            with latency.measure():
+                await handle()
+
+        calls.update(history=0, edit=0)
+        tasks = []
+        # Discord dispatches every message to its own task
+        for _ in range(args.guesses):
+            tasks.append(asyncio.create_task(guess()))
+            await asyncio.sleep(gap)
+        await asyncio.gather(*tasks)
+        return latency
+
+    async def main():
+        print(f"--- {args.guesses} guesses per run, {args.rtt * 1000:.0f} ms per REST call")
+        for gap in args.gaps:
+            thread = FakeThread()
+            edits = EditCoalescer()
+            for label, handle in (
+                ("history scan", lambda: scanned_guess(thread)),
+                ("cached", lambda: cached_guess(thread)),
+                ("cached + coalesced", lambda: coalesced_guess(thread, edits)),
+            ):
+                latency = await run(gap, handle)
+                summary = latency.summary()
+                rest = calls["history"] + calls["edit"]
+                print(f"{label + f' (every {gap}s)':<32} mean {summary['mean_ms']:>6.0f} ms  "
+                      f"p95 {summary['p95_ms']:>6.0f} ms  {rest / args.guesses:>5.2f} REST calls/guess "
+                      f"({calls['history']} history, {calls['edit']} edits)")
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cemantix micro-benchmarks.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    sessions = subparsers.add_parser("sessions", help=bench_sessions.__doc__)
+    sessions.add_argument("--sessions", type=int, default=10_000)
+    sessions.add_argument("--history", type=int, default=20)
+    sessions.add_argument("--lookups", type=int, default=1_000_000)
+    sessions.set_defaults(func=bench_sessions)
+
+    leaderboard = subparsers.add_parser("leaderboard", help=bench_leaderboard.__doc__)
+    leaderboard.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    leaderboard.add_argument("--queries", type=int, default=10_000)
+    leaderboard.add_argument("--tied", type=float, default=0.9, help="Share of players at 0 points in the ties case")
+    leaderboard.add_argument("--no-sql", dest="sql", action="store_false", help="Skip the SQL baseline")
+    leaderboard.set_defaults(func=bench_leaderboard)
+
+    replay = subparsers.add_parser("replay", help=bench_replay.__doc__)
+    replay.add_argument("--games", type=int, default=1_000_000)
+    replay.add_argument("--players", type=int, default=10_000)
+    replay.add_argument("--no-sequential", dest="sequential", action="store_false",
+                        help="Skip the PlayerRank baseline")
+    replay.set_defaults(func=bench_replay)
+
+    players = subparsers.add_parser("players", help=bench_players.__doc__)
+    players.add_argument("--players", type=int, default=1_000_000)
+    players.set_defaults(func=bench_players)
+
+    quantization = subparsers.add_parser("quantization", help=bench_quantization.__doc__)
+    quantization.add_argument("--batch", type=int, default=256)
+    quantization.set_defaults(func=bench_quantization)
+
+    words = subparsers.add_parser("words", help=bench_words.__doc__)
+    words.add_argument("--lookups", type=int, default=10_000)
+    words.set_defaults(func=bench_words)
+
+    rpc = subparsers.add_parser("rpc", help=bench_rpc.__doc__)
+    rpc.add_argument("--targets", type=int, default=20)
+    rpc.add_argument("--requests", type=int, default=10_000)
+    rpc.add_argument("--batch", type=int, default=1)
+    rpc.set_defaults(func=bench_rpc)
+
+    timers = subparsers.add_parser("timers", help=bench_timers.__doc__)
+    timers.add_argument("--games", type=int, default=10_000)
+    timers.add_argument("--refreshes", type=int, default=100_000)
+    timers.set_defaults(func=bench_timers)
+
+    feedback = subparsers.add_parser("feedback", help=bench_feedback.__doc__)
+    feedback.add_argument("--guesses", type=int, default=10)
+    feedback.add_argument("--gaps", type=float, nargs="+", default=[1.0, 0.1], help="Seconds between two guesses")
+    feedback.add_argument("--rtt", type=float, default=0.1, help="Seconds per REST call")
+    feedback.set_defaults(func=bench_feedback)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Offline asset builder for the Cemantix game plugin.
+Converts the raw word2vec model into the pruned, memory-mappable embedding store loaded by the bot, indexes its words, rates the mystery words difficulty and records the build in a checksummed manifest.
+
+Usage: python build_assets.py [--model PATH] [--store DIR] [--index-only | --difficulty-only | --verify]
+"""
+
+import sys
+import os
+import argparse
+import time
+from pathlib import Path
+
+# Add to python path to use local plugin files dependencies
+sys.path.append(os.path.dirname(__file__))
+
+from embedding_store import EmbeddingStore, STORE_DIR
+from word_difficulty import compute_difficulties, save_difficulties
+from word_index import WordIndex
+from game_assets import (
+    DICTIONARY_FILE,
+    file_checksum,
+    load_mystery_pool,
+    read_manifest,
+    save_mystery_pool,
+    verify_manifest,
+    write_manifest,
+)
+
+DATA_DIR = Path(__file__).parent / "data"
+MODEL_PATH = DATA_DIR / "frWac_no_postag_no_phrase_700_skip_cut50.bin"
+DICTIONARY_PATH = DATA_DIR / "dictionnary.txt"
+MYSTERY_PATH = DATA_DIR / "mystery.txt"
+
+
+def read_word_list(path: Path) -> list:
+    """Read a word list file, one word per line, skipping blank lines."""
+    if not path.exists():
+        raise FileNotFoundError(f"Word list not found at {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return [word for word in (line.strip() for line in f) if word]
+
+
+def build_store(
+    model_path: Path = MODEL_PATH,
+    dictionary_path: Path = DICTIONARY_PATH,
+    mystery_path: Path = MYSTERY_PATH,
+    store_dir: Path = STORE_DIR,
+) -> dict:
+    """
+    Prune the raw model to the game vocabulary and write the embedding store,
+    then every artifact derived from it.
+
+    Words keep the model order (frequency order for frWac), so a word's index
+    in the store is also its frequency rank within the game vocabulary.
+
+    Returns:
+        dict: Build statistics (kept words, missing words, build version, elapsed time)
+    """
+    # gensim is only needed offline, the bot itself never imports it
+    from gensim.models import KeyedVectors
+
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model file not found at {model_path}")
+
+    start = time.perf_counter()
+    wanted = set(read_word_list(dictionary_path)) | set(read_word_list(mystery_path))
+
+    model = KeyedVectors.load_word2vec_format(model_path, binary=True)
+    words = [word for word in model.index_to_key if word in wanted]
+    vectors = model.vectors[[model.key_to_index[word] for word in words]]
+
+    EmbeddingStore.save(store_dir, words, vectors)
+    stats = build_index(dictionary_path, mystery_path, store_dir, {model_path.name: file_checksum(model_path)})
+
+    return {
+        "kept": len(words),
+        "missing": sorted(wanted.difference(words)),
+        "version": stats["version"],
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def build_index(
+    dictionary_path: Path = DICTIONARY_PATH,
+    mystery_path: Path = MYSTERY_PATH,
+    store_dir: Path = STORE_DIR,
+    model_source: dict = None,
+) -> dict:
+    """
+    Build the artifacts derived from an existing store and write the build manifest.
+
+    The word lists are checked against the store here, once: the mystery pool
+    only keeps words the store can score, and the guessable words are the
+    dictionary and mystery words of the store. The bot loads them as they are.
+
+    Args:
+        model_source: Optional; Raw model checksum (file name: checksum), kept from the previous manifest if omitted
+
+    Returns:
+        dict: Build statistics (guessable words, mystery words, dropped mystery words, build version, elapsed time)
+    """
+    start = time.perf_counter()
+    store = EmbeddingStore.load(store_dir)
+    if model_source is None:
+        previous = read_manifest(store_dir)
+        model_source = {
+            name: checksum
+            for name, checksum in (previous["sources"] if previous else {}).items()
+            if name not in (dictionary_path.name, mystery_path.name)
+        }
+
+    mystery = list(dict.fromkeys(read_word_list(mystery_path)))
+    pool = [word for word in mystery if word in store]
+    save_mystery_pool(pool, store_dir)
+
+    # A mystery word must be guessable even if the dictionary misses it
+    guessable = [word for word in read_word_list(dictionary_path) if word in store] + pool
+    # Homographs once accents are stripped resolve to the most frequent word
+    WordIndex(guessable, priority=store.index.__getitem__).save(store_dir / DICTIONARY_FILE)
+
+    save_difficulties(compute_difficulties(store, pool), store_dir)
+
+    manifest = write_manifest(
+        {
+            **model_source,
+            dictionary_path.name: file_checksum(dictionary_path),
+            mystery_path.name: file_checksum(mystery_path),
+        },
+        {"vocabulary": len(store), "guessable": len(set(guessable)), "mystery": len(pool)},
+        store_dir,
+    )
+
+    return {
+        "guessable": manifest["counts"]["guessable"],
+        "mystery": len(pool),
+        "dropped": [word for word in mystery if word not in store],
+        "version": manifest["version"],
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def build_difficulties(store_dir: Path = STORE_DIR) -> dict:
+    """
+    Rate the mystery pool of an existing build again and update its manifest.
+
+    Returns:
+        dict: Build statistics (rated words, build version, elapsed time)
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No Cemantix build in {store_dir}, run build_assets.py first")
+
+    start = time.perf_counter()
+    store = EmbeddingStore.load(store_dir)
+    words = load_mystery_pool(store_dir)
+    save_difficulties(compute_difficulties(store, words), store_dir)
+    manifest = write_manifest(manifest["sources"], manifest["counts"], store_dir)
+
+    return {
+        "rated": len(words),
+        "version": manifest["version"],
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Cemantix embedding store.")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help="Raw word2vec binary model")
+    parser.add_argument("--dictionary", type=Path, default=DICTIONARY_PATH, help="Accepted words list")
+    parser.add_argument("--mystery", type=Path, default=MYSTERY_PATH, help="Mystery words list")
+    parser.add_argument("--store", type=Path, default=STORE_DIR, help="Output directory")
+    parser.add_argument("--index-only", action="store_true",
+                        help="Only rebuild the artifacts derived from an existing store (word lists, index, difficulties)")
+    parser.add_argument("--difficulty-only", action="store_true",
+                        help="Only recompute the word difficulties of an existing store")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the files of an existing build against its manifest checksums")
+    args = parser.parse_args()
+
+    if args.verify:
+        altered = verify_manifest(args.store)
+        if altered:
+            sys.exit(f"❌ Altered or missing files in {args.store}: {', '.join(altered)}")
+        print(f"✅ Build {read_manifest(args.store)['version']} is intact")
+        return
+
+    if args.difficulty_only:
+        stats = build_difficulties(args.store)
+        print(f"✅ Rated {stats['rated']} mystery words, build {stats['version']} ({stats['elapsed']:.1f}s)")
+        return
+
+    if args.index_only:
+        stats = build_index(args.dictionary, args.mystery, args.store)
+        print(f"✅ Indexed {stats['guessable']} words, {stats['mystery']} mystery words, "
+              f"build {stats['version']} ({stats['elapsed']:.1f}s)")
+        if stats["dropped"]:
+            print(f"⚠️  {len(stats['dropped'])} mystery words are not in the store: {', '.join(stats['dropped'][:10])}")
+        return
+
+    stats = build_store(args.model, args.dictionary, args.mystery, args.store)
+    print(f"✅ Stored {stats['kept']} words in {args.store}, build {stats['version']} ({stats['elapsed']:.1f}s)")
+    if stats["missing"]:
+        print(f"⚠️  {len(stats['missing'])} words are not in the model: {', '.join(stats['missing'][:10])}")
+
+
+if __name__ == "__main__":
+    main()
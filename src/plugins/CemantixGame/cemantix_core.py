@@ -1,66 +1,74 @@
-"""Module related to the word management of the Cemantix game plugin. Handles the word list and the word2vec model."""
+"""Module related to the word management of the Cemantix game plugin. Loads the word lists and word vectors built by build_assets.py."""
 
-from gensim.models import KeyedVectors
-from pathlib import Path
 import random
 
+from embedding_store import EmbeddingStore, STORE_DIR, VECTORS_FILE
+from build_assets import build_index, build_store, MODEL_PATH
+from game_assets import DICTIONARY_FILE, load_mystery_pool, read_manifest
+from word_difficulty import load_difficulties, DEFAULT_DIFFICULTY
+from word_index import WordIndex
+
 
 class GameManager:
-    def __init__(self):
+    def __init__(self, precision: str = "float32"):
+        """
+        Args:
+            precision: Optional; Precision of the word vectors, "float32", "float16" or "int8"
+        """
         self.model = None
-        self.dictionary = set()
+        self.dictionary = WordIndex(())
         self.mystery_words = []
-        self.current_mystery_word = None
-
+        self.difficulties = None  # Rating per store index, see word_difficulty.py
+        self.manifest = None  # Build description, see game_assets.py
         try:
-            # Load word vectors
-            model_path = (
-                Path(__file__).parent
-                / "data/frWac_no_postag_no_phrase_700_skip_cut50.bin"
-            )
-            if not model_path.exists():
-                raise FileNotFoundError(f"Model file not found at {model_path}")
+            # Load the prebuilt assets, building them on first run only
+            self.manifest = read_manifest()
+            if self.manifest is None:
+                if (STORE_DIR / VECTORS_FILE).exists():
+                    print("⚙️  Indexing the Cemantix word lists, this only happens once ...")
+                    build_index()
+                else:
+                    if not MODEL_PATH.exists():
+                        raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
+                    print("⚙️  Building the Cemantix embedding store, this only happens once ...")
+                    build_store()
+                self.manifest = read_manifest()
 
-            self.model = KeyedVectors.load_word2vec_format(model_path, binary=True)
+            # The build checked the word lists against the store, they are loaded as they are
+            self.model = EmbeddingStore.load(precision=precision)
+            self.difficulties = load_difficulties(self.model)
+            self.dictionary = WordIndex.load(STORE_DIR / DICTIONARY_FILE)
+            self.mystery_words = load_mystery_pool()
 
-            # Load dictionary words
-            dict_path = Path(__file__).parent / "data/dictionnary.txt"
-            if not dict_path.exists():
-                raise FileNotFoundError(f"Dictionary file not found at {dict_path}")
+        except Exception as e:
+            raise
 
-            with open(dict_path, "r", encoding="utf-8") as f:
-                self.dictionary = set(line.strip() for line in f)
+    def start_new_game(self):
+        """
+        Select a new mystery word for a game
 
-            # Load mystery words
-            mystery_path = Path(__file__).parent / "data/mystery.txt"
-            if not mystery_path.exists():
-                raise FileNotFoundError(
-                    f"Mystery words file not found at {mystery_path}"
-                )
+        Returns:
+            tuple: (mystery word, difficulty rating from 1 to 5)
+        """
+        word = random.choice(self.mystery_words)
+        print(word)
+        return word, self.word_difficulty(word)
 
-            with open(mystery_path, "r", encoding="utf-8") as f:
-                self.mystery_words = [line.strip() for line in f]
+    def daily_word(self, day):
+        """Get the mystery word shared by every daily game of a day, the same on every restart"""
+        return random.Random(f"cemantix-{day.isoformat()}").choice(self.mystery_words)
 
-        except Exception as e:
-            raise
+    def word_difficulty(self, word) -> float:
+        """Get the precomputed difficulty of a mystery word, the median rating if unknown"""
+        if self.difficulties is None:
+            return DEFAULT_DIFFICULTY
+        difficulty = float(self.difficulties[self.model.index[word]])
+        return DEFAULT_DIFFICULTY if difficulty != difficulty else difficulty  # NaN: not rated
 
-    def start_new_game(self):
-        """Select a new mystery word for the game"""
-        self.current_mystery_word = random.choice(self.mystery_words)
-        print(self.current_mystery_word)
-        return self.current_mystery_word
+    def resolve_word(self, text):
+        """Get the dictionary word matching a player input, ignoring case, accents and plural or feminine endings. None if unknown"""
+        return self.dictionary.resolve(text)
 
     def is_word_valid(self, word):
         """Check if a word is in the dictionary"""
         return word in self.dictionary
-
-    def calculate_similarity(self, word):
-        """
-        Calculate semantic similarity between input word and mystery word
-        Returns similarity in per mille (0-1000)
-        """
-        try:
-            similarity = self.model.similarity(word, self.current_mystery_word)
-            return int(similarity * 1000)
-        except KeyError:
-            return None
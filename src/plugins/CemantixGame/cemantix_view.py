@@ -3,10 +3,15 @@
 import discord
 import random
 
+from core.user_resolver import UserResolver
+from similarity_table import TOP_RANKS
+
 
 class GameView:
     def __init__(self, bot):
-        self.bot = bot  # Discord bot instance needed to fetch usernames
+        self.bot = bot
+        self.users = UserResolver.for_bot(bot)  # Usernames of the leaderboard
+        self._sections = {}  # (section, guild_id, player_id): (leaderboard version, rendered text)
         
     def create_initial_embed(self):
         """Create the initial embed for the Cemantix game."""
@@ -30,7 +35,7 @@ class GameView:
         return view, close_button
 
     def create_game_mode_buttons(self):
-        """Create a view with buttons to select game mode (ranked or unranked)."""
+        """Create a view with buttons to select game mode (ranked, unranked, daily or co-op)."""
         view = discord.ui.View()
         ranked_button = discord.ui.Button(
             label="Partie classée", 
@@ -42,15 +47,27 @@ class GameView:
             style=discord.ButtonStyle.secondary,
             custom_id="unranked_game"
         )
+        daily_button = discord.ui.Button(
+            label="Mot du jour",
+            style=discord.ButtonStyle.success,
+            custom_id="daily_game"
+        )
+        coop_button = discord.ui.Button(
+            label="Coopération",
+            style=discord.ButtonStyle.secondary,
+            custom_id="coop_game"
+        )
         view.add_item(ranked_button)
         view.add_item(unranked_button)
-        return view, ranked_button, unranked_button
+        view.add_item(daily_button)
+        view.add_item(coop_button)
+        return view, ranked_button, unranked_button, daily_button, coop_button
 
     def create_game_mode_embed(self):
         """Create the embed for game mode selection."""
         return discord.Embed(
             title="Cemantix - Sélection du mode",
-            description="Choisissez votre mode de jeu :\n\n🏆 **Partie classée**\n- Votre score ELO évoluera\n- Le thread expirera après 5 minutes d'inactivité\n\n🎲 **Partie non classée**\n- Pas d'évolution de votre score ELO\n- Le thread n'expire pas automatiquement",
+            description="Choisissez votre mode de jeu :\n\n🏆 **Partie classée**\n- Votre score ELO évoluera\n- Le thread expirera après 5 minutes d'inactivité\n\n🎲 **Partie non classée**\n- Pas d'évolution de votre score ELO\n- Le thread n'expire pas automatiquement\n\n📅 **Mot du jour**\n- Le même mot pour tout le monde, il change à minuit\n- Pas d'évolution de votre score ELO\n\n🤝 **Partie coopérative**\n- Tous les membres du fil cherchent le même mot\n- Pas d'évolution de votre score ELO",
             color=self._get_random_color()
         )
 
@@ -59,36 +76,88 @@ class GameView:
         embed.description = f"Le mot '{word}' m'est inconnu ... 🤷"
         return embed
 
-    def update_embed_for_similarity(self, embed, word, similarity):
-        """Update the embed with the similarity score and temperature scale."""
+    def update_embed_for_similarity(self, embed, word, similarity, rank, attempts, player=None):
+        """
+        Update the embed with the similarity score, temperature scale and proximity rank.
+
+        Args:
+            attempts: Attempts of the round, guesses of concurrent players included
+            player: Optional; Name of the player in co-op games
+        """
         emoji = self._get_similarity_emoji(similarity)
         per_mille_text = f"{similarity} ‰"
         temperature = self._get_temperature(similarity)
 
-        # Get current attempt count from embed fields if it exists
-        attempts = 0
-        for field in embed.fields:
-            if field.name == "Tentatives":
-                attempts = int(field.value) + 1
-                break
-
         embed.clear_fields()
-        embed.description = f"Vous proposez : **'{word}'**"
+        embed.description = f"{self._proposer(player)} : **'{word}'**"
         embed.add_field(
             name="Similarité", value=f"{emoji} **{per_mille_text}**", inline=True
         )
         embed.add_field(name="Température", value=f"**{temperature}°C**", inline=True)
         embed.add_field(name="Tentatives", value=str(attempts), inline=True)
+        if rank is not None and rank <= TOP_RANKS:
+            embed.add_field(
+                name="Proximité", value=f"**#{rank}** / {TOP_RANKS}", inline=True
+            )
         embed.set_footer(text="Continuez à chercher !")
         return embed
 
-    def update_embed_for_correct_word(self, embed):
-        """Update the embed when the correct word is guessed."""
-        embed.description = "Félicitations ! Vous avez trouvé le mot mystère ! 🎉"
+    def update_embed_for_guesses(self, embed, guesses, attempts, unknown=(), player=None):
+        """
+        Update the embed with several words proposed in one message.
+
+        Args:
+            guesses: (word, similarity, rank) tuples in the order they were proposed
+            attempts: Attempts of the round, these guesses included
+            unknown: Words of the message that are not in the dictionary
+            player: Optional; Name of the player in co-op games
+        """
+        best_word, best_similarity, best_rank = max(guesses, key=lambda guess: guess[1])
+        embed = self.update_embed_for_similarity(embed, best_word, best_similarity, best_rank, attempts)
+
+        lines = []
+        for word, similarity, rank in guesses:
+            proximity = f" (#{rank})" if rank is not None and rank <= TOP_RANKS else ""
+            lines.append(f"{self._get_similarity_emoji(similarity)} **{word}** : {similarity} ‰{proximity}")
+        embed.description = f"{self._proposer(player)} :\n" + "\n".join(lines)
+        if unknown:
+            embed.set_footer(text=f"Mots inconnus : {', '.join(unknown)}")
+        return embed
+
+    def update_embed_for_correct_word(self, embed, player=None):
+        """Update the embed when the correct word is guessed, by `player` in co-op games."""
+        if player is None:
+            embed.description = "Félicitations ! Vous avez trouvé le mot mystère ! 🎉"
+        else:
+            embed.description = f"Félicitations ! {player} a trouvé le mot mystère ! 🎉"
         embed.clear_fields()
         embed.set_footer(text="Bien joué !")
         return embed
 
+    def add_players_field(self, embed, players, finder_id):
+        """
+        List the attempts of every player at the end of a co-op game.
+
+        Args:
+            players: Dict of user_id: attempts, in order of first guess
+            finder_id: ID of the player who found the word
+        """
+        lines = [
+            f"{'🎯' if user_id == finder_id else '•'} <@{user_id}> : {attempts}"
+            for user_id, attempts in sorted(players.items(), key=lambda player: -player[1])
+        ]
+        embed.add_field(name="Joueurs", value="\n".join(lines), inline=False)
+        return embed
+
+    def add_closest_words_field(self, embed, closest_words):
+        """Reveal the words closest to the mystery word at the end of the game."""
+        embed.add_field(
+            name="Mots les plus proches",
+            value="\n".join(f"{word} ({similarity} ‰)" for word, similarity in closest_words),
+            inline=False
+        )
+        return embed
+
     def update_embed_for_new_game(self, embed):
         """Update the embed when a new game is started."""
         embed.description = "Nouvelle partie lancée ! 🎲\nEntrez un mot et rapprochez vous du mot mystère avec le moins de tentatives possibles !"
@@ -107,6 +176,9 @@ class GameView:
         view.add_item(new_game_button)
         return view, close_button, new_game_button
 
+    def _proposer(self, player):
+        return "Vous proposez" if player is None else f"{player} propose"
+
     def _get_similarity_emoji(self, similarity):
         """Get the emoji corresponding to the similarity score."""
         if similarity == 1000:
@@ -156,7 +228,7 @@ class GameView:
         return discord.Color(random.randint(0, 0xFFFFFF))
 
     def create_history_embed(self, history):
-        """Create the embed for the game history, using columns."""
+        """Create the embed for the game history, using columns. `history` iterates (word, similarity), best first."""
         embed = discord.Embed(
             title="Historique", color=discord.Color.light_grey()
         )
@@ -193,7 +265,7 @@ class GameView:
         embed.set_footer(text="Merci d'avoir joué !")
         return embed
 
-    async def create_ranking_embed(self, player_id: str, player_data: dict, nearby_players: list = None, top_players: list = None):
+    async def create_ranking_embed(self, player_id: str, player_data: dict, nearby_players: list = None, top_players: list = None, guild_id: str = None, version: int = None):
         """
         Create an embed to display player ranking and leaderboard.
         
@@ -202,6 +274,8 @@ class GameView:
             player_data: Dictionary containing player's rank info
             nearby_players: List of nearby players with their ranks (rank, pid, grade, tier, points)
             top_players: List of top players (pid, grade, tier, points)
+            guild_id: Optional; ID of the guild of the leaderboard
+            version: Optional; Leaderboard version, the rendered sections are reused until it changes
         """
         embed = discord.Embed(
             title="🏆 Classement Cemantix",
@@ -220,18 +294,33 @@ class GameView:
             inline=False
         )
 
+        # Rendered sections stay valid as long as no ranking of the guild changes
+        nearby_key = ("nearby", guild_id, player_id)
+        top_key = ("top", guild_id, len(top_players or ()))
+        nearby_text = self._cached_section(nearby_key, version)
+        top_text = self._cached_section(top_key, version)
+
+        # Usernames of both sections are resolved in one batch
+        pids = []
+        if nearby_players and nearby_text is None:
+            pids += [pid for _, pid, _, _, _ in nearby_players]
+        if top_players and top_text is None:
+            pids += [pid for pid, _, _, _ in top_players]
+        users = await self.users.users(pids) if pids else {}
+
+        def username(pid):
+            user = users.get(int(pid))
+            return user.name if user else "Utilisateur inconnu"
+
         # Nearby players section
         if nearby_players:
-            nearby_text = "```\n"
-            for rank, pid, grade, tier, points in nearby_players:
-                prefix = "→" if pid == player_id else " "
-                try:
-                    user = await self.bot.fetch_user(int(pid))
-                    username = user.name
-                except:
-                    username = "Utilisateur inconnu"
-                nearby_text += f"{prefix} #{rank:<4} | {username:<20} | {grade} {tier} | {points} pts\n"
-            nearby_text += "```"
+            if nearby_text is None:
+                nearby_text = "```\n"
+                for rank, pid, grade, tier, points in nearby_players:
+                    prefix = "→" if pid == player_id else " "
+                    nearby_text += f"{prefix} #{rank:<4} | {username(pid):<20} | {grade} {tier} | {points} pts\n"
+                nearby_text += "```"
+                self._cache_section(nearby_key, version, nearby_text)
             embed.add_field(
                 name="🎯 Classement local",
                 value=nearby_text,
@@ -240,16 +329,13 @@ class GameView:
 
         # Top players section
         if top_players:
-            top_text = "```\n"
-            for i, (pid, grade, tier, points) in enumerate(top_players, 1):
-                medal = ["🥇", "🥈", "🥉"][i-1]
-                try:
-                    user = await self.bot.fetch_user(int(pid))
-                    username = user.name
-                except:
-                    username = "Utilisateur inconnu"
-                top_text += f"{medal} #{i:<2} | {username:<20} | {grade} {tier} | {points} pts\n"
-            top_text += "```"
+            if top_text is None:
+                top_text = "```\n"
+                for i, (pid, grade, tier, points) in enumerate(top_players, 1):
+                    medal = ["🥇", "🥈", "🥉"][i-1]
+                    top_text += f"{medal} #{i:<2} | {username(pid):<20} | {grade} {tier} | {points} pts\n"
+                top_text += "```"
+                self._cache_section(top_key, version, top_text)
             embed.add_field(
                 name="👑 Top 3",
                 value=top_text,
@@ -267,6 +353,21 @@ class GameView:
         embed.set_footer(text="Continuez à jouer pour améliorer votre classement !")
         return embed
 
+    def _cached_section(self, key: tuple, version: int):
+        """Get a rendered leaderboard section, None if missing or rendered for another version."""
+        entry = self._sections.get(key)
+        if version is None or entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def _cache_section(self, key: tuple, version: int, text: str):
+        """Keep a rendered leaderboard section until the leaderboard version changes."""
+        if version is None:
+            return
+        if len(self._sections) >= 4096:
+            self._sections.clear()  # Mostly stale sections of players who asked once
+        self._sections[key] = (version, text)
+
     def _create_progress_bar(self, value: int, max_value: int = 100, length: int = 10) -> str:
         """
         Create a text-based progress bar.
@@ -0,0 +1,103 @@
+"""Module related to the daily word of the Cemantix game plugin. Stores the shared table of each day as memory-mappable files."""
+
+import datetime
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from embedding_store import STORE_DIR
+from similarity_table import SimilarityTable
+
+DAILY_DIR = STORE_DIR / "daily"
+SCORES_FILE = "scores.npy"
+RANKS_FILE = "ranks.npy"
+WORD_FILE = "word.txt"
+
+
+def seconds_until_midnight(now: datetime.datetime = None) -> float:
+    """Seconds left before the next local midnight, when the daily word changes."""
+    now = now or datetime.datetime.now()
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+    return (midnight - now).total_seconds()
+
+
+def write_daily(store, day: datetime.date, word: str, daily_dir: Path = DAILY_DIR) -> bool:
+    """
+    Build the table of a day and write it to disk, unless it is already there.
+
+    The files are written in a temporary directory renamed at the end, so a
+    crash never leaves a half-written day behind.
+
+    Args:
+        store: EmbeddingStore holding the normalized vectors
+        day: Day of the table
+        word: Daily mystery word
+        daily_dir: Optional; Directory of the daily tables
+
+    Returns:
+        bool: True if the table was built, False if it was cached
+    """
+    day_dir = daily_dir / day.isoformat()
+    cached = load_daily(day, store.index, daily_dir)
+    if cached is not None and cached.target == word:
+        return False
+
+    table = SimilarityTable.build(store, word)
+    # Unique per writer, two threads or processes writing the same day never share it
+    daily_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{day.isoformat()}.", dir=daily_dir))
+    np.save(tmp_dir / SCORES_FILE, table.scores)
+    np.save(tmp_dir / RANKS_FILE, table.ranks)
+    # Written last, its presence marks a complete day
+    with open(tmp_dir / WORD_FILE, "w", encoding="utf-8") as f:
+        f.write(word)
+
+    # Another writer may have finished the day meanwhile, only a stale day is replaced
+    cached = load_daily(day, store.index, daily_dir)
+    if cached is not None and cached.target == word:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return True
+    # Left by another word list or store, the day is built again
+    shutil.rmtree(day_dir, ignore_errors=True)
+    try:
+        os.replace(tmp_dir, day_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)  # Another worker wrote the same day first
+    return True
+
+
+def load_daily(day: datetime.date, index: dict, daily_dir: Path = DAILY_DIR):
+    """
+    Memory-map the table of a day written by write_daily().
+
+    Args:
+        day: Day of the table
+        index: Word to store index mapping of the current store
+
+    Returns:
+        SimilarityTable: The daily table, or None if missing or built for another store
+    """
+    day_dir = daily_dir / day.isoformat()
+    word_path = day_dir / WORD_FILE
+    if not word_path.exists():
+        return None
+
+    with open(word_path, "r", encoding="utf-8") as f:
+        word = f.read()
+    scores = np.load(day_dir / SCORES_FILE, mmap_mode="r")
+    ranks = np.load(day_dir / RANKS_FILE, mmap_mode="r")
+    if len(scores) != len(index) or word not in index:
+        return None
+    return SimilarityTable(word, index, scores, ranks)
+
+
+def prune_daily(keep: int = 2, daily_dir: Path = DAILY_DIR):
+    """Delete the tables of every day but the `keep` most recent ones."""
+    if not daily_dir.exists():
+        return
+    days = sorted(path for path in daily_dir.iterdir() if path.is_dir() and not path.name.startswith("."))
+    for path in days[:-keep]:
+        shutil.rmtree(path, ignore_errors=True)
@@ -1,18 +1,41 @@
+import asyncio
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 
 class DatabaseContext:
+    """
+    Long-lived SQLite connection owned by a dedicated DB thread.
+
+    Every query runs on that thread, through run() from async code, so the
+    event loop never waits on disk I/O. SQLite serializes writers anyway, so
+    one WAL connection reused for every operation is the whole pool; it also
+    keeps its compiled statements cached between calls.
+    """
+
     def __init__(self, db_path: Path):
         self.db_path = db_path
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cemantix-db")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, cached_statements=128)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    async def run(self, fn, *args):
+        """Run a function using the connection on the DB thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
 
     @contextmanager
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """Get the shared connection. Must be called from the DB thread."""
+        if self._conn is None:
+            self._conn = self._connect()
+        yield self._conn
 
     @contextmanager
     def get_cursor(self):
@@ -23,4 +46,16 @@ class DatabaseContext:
                 conn.commit()
             except Exception as e:
                 conn.rollback()
-                raise e 
\ No newline at end of file
+                raise e
+            finally:
+                cursor.close()
+
+    def _close_connection(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def close(self):
+        """Close the connection and stop the DB thread once pending queries are done."""
+        await self.run(self._close_connection)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,175 @@
+"""Module related to the embedding storage of the Cemantix game plugin. Loads the pruned word vectors produced by build_assets.py."""
+
+from pathlib import Path
+
+import numpy as np
+
+STORE_DIR = Path(__file__).parent / "data/store"
+VECTORS_FILE = "vectors.npy"
+VOCAB_FILE = "vocab.txt"
+
+# Vector files per precision, the quantized ones are derived from the float32 file on first load
+PRECISION_FILES = {
+    "float32": VECTORS_FILE,
+    "float16": "vectors_f16.npy",
+    "int8": "vectors_i8.npy",
+}
+SCALES_FILE = "scales_i8.npy"  # Per-row scale of the int8 vectors
+
+# Rows dequantized at once by dot(), bounds the temporary float32 buffer (about 3 MB)
+CHUNK_ROWS = 1024
+
+
+class EmbeddingStore:
+    """
+    Read-only view over the pruned Cemantix vocabulary.
+
+    The vectors are L2-normalized rows memory-mapped from disk, so a cosine
+    similarity is a plain dot product and every bot process on the host shares
+    the same page-cache pages instead of holding a private copy.
+
+    On low-memory hosts the rows can be held as float16 (half the size) or as
+    int8 with one float32 scale per row (a quarter). Products are then computed
+    by chunks of dequantized float32 rows, through dot() and rows().
+    """
+
+    def __init__(self, vectors: np.ndarray, words: list, scales: np.ndarray = None):
+        self.vectors = vectors
+        self.words = words
+        self.scales = scales  # int8 only: row i is vectors[i] * scales[i]
+        self.precision = "int8" if scales is not None else np.dtype(vectors.dtype).name
+        self.index = {word: i for i, word in enumerate(words)}
+
+    @classmethod
+    def load(cls, store_dir: Path = STORE_DIR, precision: str = "float32"):
+        """
+        Memory-map a store previously written by save().
+
+        Args:
+            store_dir: Directory containing the vectors and vocabulary files
+            precision: Optional; "float32", "float16" or "int8"
+
+        Returns:
+            EmbeddingStore: The loaded store
+        """
+        if precision not in PRECISION_FILES:
+            raise ValueError(f"Unknown vector precision: {precision}")
+
+        vectors_path = store_dir / VECTORS_FILE
+        vocab_path = store_dir / VOCAB_FILE
+        if not vectors_path.exists() or not vocab_path.exists():
+            raise FileNotFoundError(f"Embedding store not found at {store_dir}")
+
+        if not (store_dir / PRECISION_FILES[precision]).exists():
+            cls.quantize(store_dir, precision)
+
+        vectors = np.load(store_dir / PRECISION_FILES[precision], mmap_mode="r")
+        scales = np.load(store_dir / SCALES_FILE) if precision == "int8" else None
+        with open(vocab_path, "r", encoding="utf-8") as f:
+            words = f.read().splitlines()
+
+        if len(words) != vectors.shape[0]:
+            raise ValueError(
+                f"Embedding store is corrupted: {len(words)} words for {vectors.shape[0]} vectors"
+            )
+        return cls(vectors, words, scales)
+
+    @staticmethod
+    def save(store_dir: Path, words: list, vectors: np.ndarray):
+        """
+        Normalize and write the vectors and vocabulary to disk.
+
+        Args:
+            store_dir: Destination directory
+            words: Vocabulary, in the same order as the vector rows
+            vectors: Raw (unnormalized) word vectors
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        store_dir.mkdir(parents=True, exist_ok=True)
+        np.save(store_dir / VECTORS_FILE, vectors)
+        with open(store_dir / VOCAB_FILE, "w", encoding="utf-8") as f:
+            f.write("\n".join(words))
+
+        # Quantized copies would be stale now
+        for name in (PRECISION_FILES["float16"], PRECISION_FILES["int8"], SCALES_FILE):
+            (store_dir / name).unlink(missing_ok=True)
+
+    @staticmethod
+    def quantize(store_dir: Path, precision: str):
+        """
+        Write a quantized copy of the float32 vectors, chunk by chunk so the
+        full float32 matrix never has to fit in memory.
+
+        Args:
+            store_dir: Directory of the store
+            precision: "float16" or "int8" (symmetric, one scale per row)
+        """
+        source = np.load(store_dir / VECTORS_FILE, mmap_mode="r")
+        dtype = np.float16 if precision == "float16" else np.int8
+        path = store_dir / PRECISION_FILES[precision]
+        tmp_path = path.with_suffix(".tmp.npy")
+
+        target = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=source.shape)
+        scales = np.empty(len(source), dtype=np.float32)
+        for start in range(0, len(source), CHUNK_ROWS):
+            chunk = np.asarray(source[start:start + CHUNK_ROWS], dtype=np.float32)
+            if precision == "float16":
+                target[start:start + len(chunk)] = chunk
+                continue
+            chunk_scales = np.abs(chunk).max(axis=1) / 127
+            chunk_scales[chunk_scales == 0] = 1.0
+            target[start:start + len(chunk)] = np.round(chunk / chunk_scales[:, None])
+            scales[start:start + len(chunk)] = chunk_scales
+        target.flush()
+        del target
+
+        if precision == "int8":
+            np.save(store_dir / SCALES_FILE, scales)
+        tmp_path.replace(path)  # The vectors file last, its presence marks a complete copy
+
+    def __contains__(self, word):
+        return word in self.index
+
+    def __len__(self):
+        return len(self.words)
+
+    def rows(self, indexes) -> np.ndarray:
+        """Get stored rows as float32 vectors (dequantized if needed)."""
+        rows = np.asarray(self.vectors[indexes], dtype=np.float32)
+        if self.scales is not None:
+            rows *= self.scales[indexes][..., None]
+        return rows
+
+    def dot(self, other: np.ndarray) -> np.ndarray:
+        """
+        Product of every stored vector with a vector or matrix.
+
+        Args:
+            other: float32 array of shape (dimensions,) or (dimensions, columns)
+
+        Returns:
+            np.ndarray: float32 array of shape (words,) or (words, columns)
+        """
+        if self.precision == "float32":
+            return self.vectors @ other
+
+        result = np.empty((len(self.vectors),) + other.shape[1:], dtype=np.float32)
+        for start in range(0, len(self.vectors), CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, len(self.vectors))
+            product = np.asarray(self.vectors[start:end], dtype=np.float32) @ other
+            if self.scales is not None:
+                product *= self.scales[start:end].reshape((-1,) + (1,) * (other.ndim - 1))
+            result[start:end] = product
+        return result
+
+    def vector(self, word) -> np.ndarray:
+        """Get the normalized vector of a word. Raises KeyError if unknown."""
+        return self.rows(self.index[word])
+
+    def similarity(self, word, other) -> float:
+        """Cosine similarity between two words. Raises KeyError if one is unknown."""
+        return float(np.dot(self.vector(word), self.vector(other)))
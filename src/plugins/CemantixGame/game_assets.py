@@ -0,0 +1,116 @@
+"""Module related to the built assets of the Cemantix game plugin. Describes a build with a checksummed manifest, and holds its mystery pool."""
+
+import datetime
+import hashlib
+import json
+from pathlib import Path
+
+from embedding_store import STORE_DIR, VECTORS_FILE, VOCAB_FILE
+from word_difficulty import DIFFICULTY_FILE
+
+MANIFEST_FILE = "manifest.json"
+DICTIONARY_FILE = "dictionary.tsv"  # WordIndex of the guessable words, see word_index.py
+MYSTERY_FILE = "mystery.txt"  # Mystery words present in the store, one per line
+
+# Bumped when an artifact changes layout, older builds are rebuilt on start
+ASSETS_FORMAT = 2
+
+# Files produced by build_assets.py and checksummed in the manifest, the quantized vectors are derived on load
+ARTIFACT_FILES = (
+    VECTORS_FILE,
+    VOCAB_FILE,
+    DICTIONARY_FILE,
+    MYSTERY_FILE,
+    DIFFICULTY_FILE,
+)
+
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of a file, read by chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_manifest(sources: dict, counts: dict, store_dir: Path = STORE_DIR) -> dict:
+    """
+    Checksum the artifacts of a build and write its manifest.
+
+    The manifest is written last, its presence marks a complete build.
+
+    Args:
+        sources: Inputs of the build (file name: checksum)
+        counts: Sizes of the build (vocabulary, guessable words, mystery words ...)
+        store_dir: Optional; Directory of the build
+
+    Returns:
+        dict: The manifest
+    """
+    files = {
+        name: {"sha256": file_checksum(store_dir / name), "bytes": (store_dir / name).stat().st_size}
+        for name in ARTIFACT_FILES
+    }
+    # The version names the content, two identical builds share it
+    digest = hashlib.sha256("".join(files[name]["sha256"] for name in ARTIFACT_FILES).encode())
+    manifest = {
+        "format": ASSETS_FORMAT,
+        "version": digest.hexdigest()[:12],
+        "built": datetime.datetime.now().isoformat(timespec="seconds"),
+        "sources": sources,
+        "counts": counts,
+        "files": files,
+    }
+
+    tmp_path = store_dir / f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(store_dir / MANIFEST_FILE)
+    return manifest
+
+
+def read_manifest(store_dir: Path = STORE_DIR):
+    """
+    Read the manifest of a build, without checking the files.
+
+    Returns:
+        dict: The manifest, or None if missing or written for another assets format
+    """
+    path = store_dir / MANIFEST_FILE
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != ASSETS_FORMAT:
+        return None
+    return manifest
+
+
+def verify_manifest(store_dir: Path = STORE_DIR) -> list:
+    """
+    Check every artifact of a build against its manifest checksum.
+
+    Returns:
+        list: Names of the missing or altered files, empty if the build is intact
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        return [MANIFEST_FILE]
+    return [
+        name
+        for name, expected in manifest["files"].items()
+        if not (store_dir / name).exists() or file_checksum(store_dir / name) != expected["sha256"]
+    ]
+
+
+def save_mystery_pool(words: list, store_dir: Path = STORE_DIR):
+    """Write the mystery words of a build, in the order of the source list."""
+    with open(store_dir / MYSTERY_FILE, "w", encoding="utf-8") as f:
+        f.write("\n".join(words))
+
+
+def load_mystery_pool(store_dir: Path = STORE_DIR) -> list:
+    """Read the mystery words written by save_mystery_pool(), all present in the store."""
+    with open(store_dir / MYSTERY_FILE, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
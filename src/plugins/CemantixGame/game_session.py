@@ -0,0 +1,139 @@
+"""Module related to the game state of the Cemantix game plugin. Holds one session per game thread."""
+
+import asyncio
+import time
+from enum import Enum
+
+from guess_history import GuessHistory
+
+
+class GameMode(Enum):
+    RANKED = "ranked"
+    UNRANKED = "unranked"
+    DAILY = "daily"  # Shared word of the day, unranked
+    COOP = "coop"  # Every member of a public thread guesses, unranked
+
+
+class GameSession:
+    """State of the game played in one thread."""
+
+    __slots__ = (
+        "thread_id",
+        "user_id",
+        "mode",
+        "table",
+        "difficulty",
+        "history",
+        "attempts",
+        "players",
+        "finished",
+        "lock",
+        "start_time",
+        "embed_message",
+        "history_message",
+    )
+
+    def __init__(self, thread_id: int, user_id: str, mode: GameMode):
+        self.thread_id = thread_id
+        self.user_id = user_id
+        self.mode = mode
+        self.table = None  # SimilarityTable of the current mystery word
+        self.difficulty = None  # Difficulty rating (1-5) of the current mystery word
+        self.history = GuessHistory()  # Best guesses and log of the current round
+        self.attempts = 0
+        self.players = {}  # user_id: attempts in the current round, in order of first guess
+        self.finished = False  # Mystery word found, later guesses do not count
+        self.lock = asyncio.Lock()  # Serializes the guesses scored against the round
+        self.start_time = time.time()
+        self.embed_message = None  # "Cemantix" game message, refreshed on each edit
+        self.history_message = None  # "Historique" message, refreshed on each edit
+
+    @property
+    def mystery_word(self):
+        return self.table.target if self.table else None
+
+    @property
+    def ranked(self) -> bool:
+        return self.mode is GameMode.RANKED
+
+    @property
+    def coop(self) -> bool:
+        return self.mode is GameMode.COOP
+
+    def can_guess(self, user_id: str) -> bool:
+        """Solo games only take the guesses of their owner, co-op games the ones of anyone in the thread."""
+        return self.coop or user_id == self.user_id
+
+    def add_attempts(self, user_id: str, count: int):
+        """Count guesses of a player, in the round total and in their own counter."""
+        self.attempts += count
+        self.players[user_id] = self.players.get(user_id, 0) + count
+
+    def start(self, table, difficulty: float, mode: GameMode = None):
+        """
+        Start a new round in this thread.
+
+        Args:
+            table: SimilarityTable of the new mystery word
+            difficulty: Difficulty rating of the new mystery word
+            mode: Optional; New game mode, keeps the current one if omitted
+        """
+        self.table = table
+        self.difficulty = difficulty
+        if mode is not None:
+            self.mode = mode
+        self.history = GuessHistory()
+        self.attempts = 0
+        self.players = {}
+        self.finished = False
+        self.start_time = time.time()
+
+
+class SessionRegistry:
+    """
+    All running game sessions, indexed by thread and by player.
+    Every operation is O(1) (O(k) for the k games of a single player).
+    """
+
+    def __init__(self):
+        self._by_thread = {}  # thread_id: GameSession
+        self._by_user = {}  # user_id: {thread_id: None}, ordered by creation
+
+    def __contains__(self, thread_id):
+        return thread_id in self._by_thread
+
+    def __len__(self):
+        return len(self._by_thread)
+
+    def create(self, thread_id: int, user_id: str, mode: GameMode) -> GameSession:
+        """Register a new session for a thread, replacing any previous one."""
+        self.remove(thread_id)
+        session = GameSession(thread_id, user_id, mode)
+        self._by_thread[thread_id] = session
+        self._by_user.setdefault(user_id, {})[thread_id] = None
+        return session
+
+    def get(self, thread_id: int):
+        """Get the session of a thread, or None."""
+        return self._by_thread.get(thread_id)
+
+    def remove(self, thread_id: int):
+        """Unregister the session of a thread and return it, or None."""
+        session = self._by_thread.pop(thread_id, None)
+        if session is None:
+            return None
+
+        threads = self._by_user.get(session.user_id)
+        if threads is not None:
+            threads.pop(thread_id, None)
+            if not threads:
+                del self._by_user[session.user_id]
+        return session
+
+    def for_user(self, user_id: str) -> list:
+        """Get the sessions started by a player, oldest first."""
+        return [self._by_thread[tid] for tid in self._by_user.get(user_id, ())]
+
+    def count_for_user(self, user_id: str) -> int:
+        """Get the number of sessions started by a player."""
+        return len(self._by_user.get(user_id, ()))
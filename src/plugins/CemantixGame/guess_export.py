@@ -0,0 +1,292 @@
+"""
+Guess log export for the Cemantix game plugin.
+Streams the guess log written by the bot into compressed files (Parquet or Arrow IPC when pyarrow is installed, gzip CSV otherwise) and computes per mystery word statistics, chunk by chunk so the log is never loaded whole.
+
+Usage: python guess_export.py [--format parquet|arrow|csv] [--output PATH] [--log PATH]
+       python guess_export.py --stats [--mode MODE] [--top N] [--log PATH]
+The log can be exported while the bot runs, guesses written meanwhile are left for the next export.
+"""
+
+import sys
+import os
+import argparse
+import gzip
+import time
+from pathlib import Path
+
+# Add to python path to use local plugin files dependencies
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from guess_log import COLUMNS, LOG_PATH
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Bytes read at a time when streaming the log, one record batch with pyarrow
+BLOCK_SIZE = 16 << 20
+
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv.gz"}
+
+
+def _arrow_schema():
+    return pa.schema([
+        ("time", pa.float64()),
+        ("guild", pa.string()),
+        ("thread", pa.int64()),
+        ("round", pa.int64()),
+        ("user", pa.string()),
+        ("mode", pa.string()),
+        ("mystery", pa.string()),
+        ("word", pa.string()),
+        ("similarity", pa.int16()),
+        ("rank", pa.int32()),  # Null when the word was not ranked
+    ])
+
+
+def _complete_size(path: Path) -> int:
+    """Size of the log up to its last complete line, a line being appended is left out."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        f.seek(max(0, size - 4096))
+        tail = f.read()
+    return size - len(tail) + tail.rfind(b"\n") + 1 if b"\n" in tail else size
+
+
+def iter_batches(path: Path, columns: list = None):
+    """
+    Stream a guess log, or one of its Parquet or Arrow exports, as pyarrow record batches.
+
+    The TSV log is memory-mapped and parsed one block at a time; exports only
+    read the requested columns.
+
+    Args:
+        path: Log or export to read
+        columns: Optional; Columns to read, all of them if omitted
+    """
+    if path.suffix == ".parquet":
+        yield from pq.ParquetFile(path).iter_batches(columns=columns)
+        return
+    if path.suffix == ".arrow":
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                yield batch.select(columns) if columns else batch
+        return
+
+    schema = _arrow_schema()
+    with pa.memory_map(str(path)) as source:
+        reader = pa_csv.open_csv(
+            pa.BufferReader(source.read_buffer(_complete_size(path))),
+            read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+            parse_options=pa_csv.ParseOptions(delimiter="\t", quote_char=False),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=schema,
+                include_columns=columns,
+                null_values=[""],
+                strings_can_be_null=False,
+            ),
+        )
+        yield from reader
+
+
+def _check_header(header: str, path: Path):
+    if header.rstrip("\n").split("\t") != list(COLUMNS):
+        raise SystemExit(f"{path} is not a guess log.")
+
+
+def iter_blocks(path: Path, size: int = BLOCK_SIZE):
+    """Stream the TSV log without its header, as blocks of complete lines of about `size` bytes."""
+    end = _complete_size(path)
+    with open(path, "rb") as f:
+        _check_header(f.readline().decode("utf-8"), path)
+        while f.tell() < end:
+            block = f.read(min(size, end - f.tell()))
+            # Cut after the last line break, the rest starts the next block
+            cut = block.rfind(b"\n") + 1
+            if cut < len(block):
+                f.seek(cut - len(block), os.SEEK_CUR)
+                block = block[:cut]
+            yield block
+
+
+def export(log_path: Path, output: Path, fmt: str) -> int:
+    """
+    Write the guess log to a compressed file, one chunk at a time.
+
+    Args:
+        log_path: TSV log written by the bot
+        output: File to write
+        fmt: "parquet", "arrow" or "csv"
+
+    Returns:
+        int: Number of guesses exported
+    """
+    count = 0
+    tmp_path = output.with_name(output.name + ".tmp")
+    if fmt == "csv":
+        # Ids, modes and dictionary words never hold a comma or a quote, tabs become commas as is
+        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+            f.write(",".join(COLUMNS).encode() + b"\n")
+            for block in iter_blocks(log_path):
+                f.write(block.replace(b"\t", b","))
+                count += block.count(b"\n")
+    else:
+        schema = _arrow_schema()
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_file(str(tmp_path), schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+        with writer:
+            for batch in iter_batches(log_path):
+                writer.write_batch(batch)
+                count += batch.num_rows
+    tmp_path.replace(output)
+    return count
+
+
+def _rounds_arrow(path: Path, mode: str = None):
+    """Attempts of every round, aggregated per record batch then merged."""
+    partials = []
+    rows = 0
+    for batch in iter_batches(path, ["thread", "round", "mode", "mystery", "word"]):
+        rows += batch.num_rows
+        table = pa.Table.from_batches([batch])
+        if mode:
+            table = table.filter(pc.equal(table["mode"], mode))
+        table = table.append_column("found", pc.equal(table["word"], table["mystery"]))
+        partials.append(
+            table.group_by(["thread", "round", "mystery"])
+            .aggregate([("word", "count"), ("found", "max")])
+        )
+    if not partials:
+        return rows, [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+    # A round can span two batches, the partial counts are summed
+    rounds = pa.concat_tables(partials).group_by(["thread", "round", "mystery"]).aggregate(
+        [("word_count", "sum"), ("found_max", "max")]
+    )
+    return (
+        rows,
+        rounds["mystery"].to_pylist(),
+        rounds["word_count_sum"].to_numpy(),
+        rounds["found_max_max"].to_numpy(zero_copy_only=False),
+    )
+
+
+def _rounds_python(path: Path, mode: str = None):
+    """Attempts of every round, counted line by line from the TSV log."""
+    rounds = {}  # (thread, round): [mystery, attempts, found]
+    rows = 0
+    last_key = entry = None
+    with open(path, "r", encoding="utf-8", newline="\n") as f:
+        _check_header(f.readline(), path)
+        for line in f:
+            if not line.endswith("\n"):
+                break  # Being appended by the bot
+            rows += 1
+            _, _, thread, round_id, _, line_mode, mystery, word, _ = line.split("\t", 8)
+            if mode and line_mode != mode:
+                continue
+            # The guesses of a round mostly follow each other
+            key = (thread, round_id)
+            if key != last_key:
+                entry = rounds.get(key)
+                if entry is None:
+                    entry = rounds[key] = [mystery, 0, False]
+                last_key = key
+            entry[1] += 1
+            if word == mystery:
+                entry[2] = True
+    return (
+        rows,
+        [entry[0] for entry in rounds.values()],
+        np.fromiter((entry[1] for entry in rounds.values()), dtype=np.int64, count=len(rounds)),
+        np.fromiter((entry[2] for entry in rounds.values()), dtype=bool, count=len(rounds)),
+    )
+
+
+def mystery_stats(mysteries: list, attempts, found) -> list:
+    """
+    Median attempts per mystery word, over the rounds where it was found.
+
+    Args:
+        mysteries: Mystery word of each round
+        attempts: Attempts of each round
+        found: Whether each round ended on the mystery word
+
+    Returns:
+        list: (word, rounds played, rounds found, median attempts) tuples, hardest first
+    """
+    words, codes = np.unique(np.asarray(mysteries, dtype=object), return_inverse=True)
+    played = np.bincount(codes, minlength=len(words))
+
+    # Found rounds sorted by word then attempts, the median is read in the middle of each group
+    codes, attempts = codes[found], attempts[found]
+    order = np.lexsort((attempts, codes))
+    codes, attempts = codes[order], attempts[order]
+    solved = np.bincount(codes, minlength=len(words))
+    starts = np.concatenate(([0], np.cumsum(solved)[:-1]))
+    medians = np.full(len(words), np.nan)
+    has_median = solved > 0
+    low = starts[has_median] + (solved[has_median] - 1) // 2
+    high = starts[has_median] + solved[has_median] // 2
+    medians[has_median] = (attempts[low] + attempts[high]) / 2
+
+    stats = [
+        (str(word), int(played[i]), int(solved[i]), float(medians[i]))
+        for i, word in enumerate(words)
+    ]
+    # Words never found last
+    stats.sort(key=lambda stat: (-stat[3] if stat[2] else float("inf"), stat[0]))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Cemantix guess log, or compute statistics from it.")
+    parser.add_argument("--log", type=Path, default=LOG_PATH,
+                        help="Guess log to read, or a Parquet/Arrow export for --stats")
+    parser.add_argument("--format", choices=list(EXTENSIONS), default="parquet" if pa else "csv",
+                        help="Export format, parquet when pyarrow is installed, csv otherwise")
+    parser.add_argument("--output", type=Path, help="Exported file, next to the log by default")
+    parser.add_argument("--stats", action="store_true", help="Print the median attempts per mystery word")
+    parser.add_argument("--mode", help="Only count the rounds of this game mode (ranked, unranked, daily, coop)")
+    parser.add_argument("--top", type=int, default=20, help="Mystery words printed by --stats, hardest first")
+    args = parser.parse_args()
+
+    if not args.log.exists():
+        raise SystemExit(f"No guess log at {args.log}")
+
+    start = time.perf_counter()
+    if args.stats:
+        if pa is not None:
+            rows, mysteries, attempts, found = _rounds_arrow(args.log, args.mode)
+        elif args.log.suffix in (".parquet", ".arrow"):
+            raise SystemExit("Reading an export needs pyarrow, use the TSV log instead.")
+        else:
+            rows, mysteries, attempts, found = _rounds_python(args.log, args.mode)
+        stats = mystery_stats(mysteries, attempts, found)
+        print(f"⚙️  Read {rows} guesses of {len(mysteries)} rounds ({int(found.sum())} found) "
+              f"in {time.perf_counter() - start:.2f}s")
+        print(f"{'Mot':<20} {'Parties':>8} {'Trouvé':>8} {'Médiane':>8}")
+        for word, played, solved, median in stats[:args.top]:
+            print(f"{word:<20} {played:>8} {solved:>8} {median:>8.1f}")
+        return
+
+    if args.format != "csv" and pa is None:
+        raise SystemExit(f"The {args.format} format needs pyarrow, use --format csv instead.")
+    output = args.output or args.log.with_suffix(EXTENSIONS[args.format])
+    count = export(args.log, output, args.format)
+    print(f"✅ Exported {count} guesses to {output} ({output.stat().st_size / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
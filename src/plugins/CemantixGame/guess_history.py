@@ -0,0 +1,72 @@
+"""Module related to the guesses of the Cemantix game plugin. Keeps the best guesses of a game for display and every guess for analytics."""
+
+import time
+from array import array
+from bisect import insort
+
+# Guesses shown in the "Historique" embed
+TOP_GUESSES = 20
+
+
+class GuessHistory:
+    """
+    Guesses of one game round.
+
+    - seen: word -> similarity, an O(1) test for words already proposed
+    - top: the K best distinct guesses, kept sorted (best first) with bisect,
+      so the embed iterates it as is; a better guess is never dropped
+    - log: every guess in order, repeats included, as parallel compact arrays
+    """
+
+    __slots__ = ("k", "seen", "_top", "_words", "_similarities", "_elapsed", "_start")
+
+    def __init__(self, k: int = TOP_GUESSES):
+        self.k = k
+        self.seen = {}  # word: similarity
+        self._top = []  # (-similarity, order, word), best first
+        self._words = []  # Log of every guess, references to the dictionary strings
+        self._similarities = array("h")  # Per mille, fits in 16 bits
+        self._elapsed = array("f")  # Seconds since the start of the round
+        self._start = time.monotonic()
+
+    def __len__(self):
+        return len(self._top)
+
+    def __iter__(self):
+        """Iterate the best guesses as (word, similarity) tuples, best first."""
+        for negative, _, word in self._top:
+            yield word, -negative
+
+    def __contains__(self, word):
+        return word in self.seen
+
+    def add(self, word: str, similarity: int) -> bool:
+        """
+        Record a guess.
+
+        Returns:
+            bool: True if the word had not been proposed yet
+        """
+        self._words.append(word)
+        self._similarities.append(similarity)
+        self._elapsed.append(time.monotonic() - self._start)
+
+        if word in self.seen:
+            return False
+        self.seen[word] = similarity
+
+        entry = (-similarity, len(self._words), word)  # Ties: first found ranks first
+        if len(self._top) < self.k or entry < self._top[-1]:
+            insort(self._top, entry)
+            if len(self._top) > self.k:
+                self._top.pop()
+        return True
+
+    def log(self):
+        """Iterate every guess in order as (word, similarity, seconds since the start) tuples."""
+        return zip(self._words, self._similarities, self._elapsed)
+
+    @property
+    def guesses(self) -> int:
+        """Number of guesses made, repeats included."""
+        return len(self._words)
@@ -0,0 +1,102 @@
+"""Module related to the guess log of the Cemantix game plugin. Appends every scored guess to a TSV file, for offline tuning of difficulties and rankings."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+LOG_PATH = Path(__file__).parent / "data/guesses.tsv"
+
+# One line per scored guess, in this order. A round is identified by its thread and its start time
+COLUMNS = ("time", "guild", "thread", "round", "user", "mode", "mystery", "word", "similarity", "rank")
+
+
+class GuessLog:
+    """
+    Append-only log of the scored guesses.
+
+    Guesses are queued in memory and written by batches on a dedicated writer
+    thread, every FLUSH_INTERVAL seconds or as soon as FLUSH_THRESHOLD of them
+    are waiting, so the event loop never waits on disk I/O. Words never hold a
+    tab or a line break (see word_index.split_words), so the lines are written
+    without quoting. See guess_export.py to turn the log into columnar files.
+    """
+
+    FLUSH_INTERVAL = 5.0
+    FLUSH_THRESHOLD = 1000
+
+    def __init__(self, path: Path = LOG_PATH):
+        self.path = path
+        self._pending = []  # Rows of COLUMNS not written yet
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cemantix-log")
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        self._flush_tasks = set()  # Threshold flushes, referenced until done
+        self.last_batch_size = 0
+
+    def open(self):
+        """Start the periodic flush."""
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        """Write every pending guess and stop the writer thread."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            await self.flush()
+        finally:
+            self._executor.shutdown()
+
+    def record(self, session, guild_id: str, user_id: str, guesses: list):
+        """
+        Queue the guesses of one message for the next flush.
+
+        Args:
+            session: GameSession the guesses were scored in
+            guild_id: ID of the guild of the game thread
+            user_id: ID of the player who proposed the words
+            guesses: (word, similarity, rank) tuples
+        """
+        now = round(time.time(), 3)
+        round_id = int(session.start_time * 1000)
+        for word, similarity, rank in guesses:
+            self._pending.append((
+                now, guild_id, session.thread_id, round_id, user_id, session.mode.value,
+                session.mystery_word, word, similarity, "" if rank is None else rank,
+            ))
+        if len(self._pending) >= self.FLUSH_THRESHOLD and not self._flush_lock.locked():
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Failed to write the Cemantix guess log: {e}")
+
+    async def flush(self):
+        """Append every pending guess to the log in one write."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            rows, self._pending = self._pending, []
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._executor, self._write, rows)
+            except Exception:
+                # Put the batch back so no guess is lost
+                self._pending[:0] = rows
+                raise
+            self.last_batch_size = len(rows)
+
+    def _write(self, rows: list):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ["\t".join(map(str, row)) for row in rows]
+        with open(self.path, "a", encoding="utf-8", newline="\n") as f:
+            if f.tell() == 0:
+                lines.insert(0, "\t".join(COLUMNS))
+            f.write("\n".join(lines) + "\n")
@@ -0,0 +1,262 @@
+"""Module related to the leaderboard of the Cemantix game plugin. Answers rank queries in memory, without scanning the players."""
+
+from bisect import bisect_left, insort
+
+
+class _SortedIds:
+    """
+    Sorted player ids of one score, with O(log n) insertion, removal and indexing.
+
+    The ids are split into sorted chunks of at most 2 * LOAD ids, so an
+    insertion or a removal only shifts one chunk, however many players share
+    the score. A Fenwick tree over the chunk lengths turns an index into a
+    chunk and back in O(log n); it is rebuilt when a chunk is split or emptied.
+    """
+
+    LOAD = 512
+
+    def __init__(self, ids=()):
+        """
+        Args:
+            ids: Optional; Player ids, already sorted
+        """
+        ids = list(ids)
+        self._chunks = [ids[i:i + self.LOAD] for i in range(0, len(ids), self.LOAD)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(ids)
+        self._rebuild()
+
+    def __len__(self):
+        return self._len
+
+    def _rebuild(self):
+        self._tree = [0] * (len(self._chunks) + 1)
+        for i, chunk in enumerate(self._chunks, 1):
+            self._tree[i] += len(chunk)
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+
+    def _add(self, chunk: int, delta: int):
+        i = chunk + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, chunk: int) -> int:
+        """Number of ids in the chunks before a chunk."""
+        total = 0
+        while chunk > 0:
+            total += self._tree[chunk]
+            chunk -= chunk & -chunk
+        return total
+
+    def add(self, player_id: str):
+        if not self._chunks:
+            self._chunks.append([player_id])
+            self._maxes.append(player_id)
+            self._len = 1
+            self._rebuild()
+            return
+        # Past the last chunk, the id goes at the end of it
+        j = min(bisect_left(self._maxes, player_id), len(self._chunks) - 1)
+        chunk = self._chunks[j]
+        insort(chunk, player_id)
+        self._maxes[j] = chunk[-1]
+        self._len += 1
+        if len(chunk) > 2 * self.LOAD:
+            self._chunks[j:j + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+            self._maxes[j:j + 1] = [chunk[self.LOAD - 1], chunk[-1]]
+            self._rebuild()
+        else:
+            self._add(j, 1)
+
+    def remove(self, player_id: str):
+        j = bisect_left(self._maxes, player_id)
+        chunk = self._chunks[j]
+        del chunk[bisect_left(chunk, player_id)]
+        self._len -= 1
+        if chunk:
+            self._maxes[j] = chunk[-1]
+            self._add(j, -1)
+        else:
+            del self._chunks[j]
+            del self._maxes[j]
+            self._rebuild()
+
+    def index(self, player_id: str) -> int:
+        """0-based index of an id in the sorted ids."""
+        j = bisect_left(self._maxes, player_id)
+        return self._before(j) + bisect_left(self._chunks[j], player_id)
+
+    def __getitem__(self, index: int) -> str:
+        # Fenwick descent to the chunk holding the index
+        chunk = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = chunk + step
+            if nxt < len(self._tree) and self._tree[nxt] <= index:
+                chunk = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return self._chunks[chunk][index]
+
+
+class Leaderboard:
+    """
+    Order-statistic index of the players by points (highest first).
+
+    A Fenwick tree counts players per point value, so "how many players have
+    more points" and "who is n-th" are O(log P), P being the highest score.
+    Players sharing a score are ordered by id in a _SortedIds, which gives
+    every player a stable position for the neighbourhood display in
+    O(log n), even when most players share the starting score.
+    """
+
+    def __init__(self, size: int = 1024):
+        self._size = size  # Point values 0 .. size - 1 are indexable
+        self._tree = [0] * (size + 1)
+        self._buckets = {}  # points: _SortedIds of the players
+        self._points = {}  # player_id: points
+        self.version = 0  # Bumped on every change, tells caches of rendered rankings they are stale
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, player_id):
+        return player_id in self._points
+
+    def _add(self, points: int, delta: int):
+        i = points + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_up_to(self, points: int) -> int:
+        """Number of players with at most `points` points."""
+        i = min(points + 1, self._size)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _kth_value(self, k: int) -> int:
+        """Point value of the k-th lowest player (1-based)."""
+        pos = 0
+        step = 1 << self._size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self._size and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos  # Fenwick index pos + 1 holds value pos
+
+    def _grow(self, points: int):
+        size = self._size
+        while size <= points:
+            size *= 2
+        self._size = size
+        self._tree = [0] * (size + 1)
+        for value, bucket in self._buckets.items():
+            self._add(value, len(bucket))
+
+    def fill(self, players):
+        """
+        Insert many players into an empty leaderboard at once.
+
+        Each score bucket is sorted once and the tree counted once, instead of
+        one insertion per player.
+
+        Args:
+            players: Iterable of (player_id, points)
+        """
+        if self._points:
+            raise ValueError("Leaderboard.fill needs an empty leaderboard")
+        self._points = dict(players)
+        buckets = {}
+        for player_id, points in self._points.items():
+            buckets.setdefault(points, []).append(player_id)
+        self._buckets = {points: _SortedIds(sorted(ids)) for points, ids in buckets.items()}
+
+        highest = max(self._buckets, default=0)
+        if highest >= self._size:
+            self._grow(highest)  # Counts the buckets in the new tree
+        else:
+            for value, bucket in self._buckets.items():
+                self._add(value, len(bucket))
+        self.version += 1
+
+    def update(self, player_id: str, points: int):
+        """Insert a player or move it to its new score."""
+        old = self._points.get(player_id)
+        if old == points:
+            return
+        if old is not None:
+            self.remove(player_id)
+        self.version += 1
+        if points >= self._size:
+            self._grow(points)
+
+        self._points[player_id] = points
+        bucket = self._buckets.get(points)
+        if bucket is None:
+            bucket = self._buckets[points] = _SortedIds()
+        bucket.add(player_id)
+        self._add(points, 1)
+
+    def remove(self, player_id: str):
+        """Remove a player from the leaderboard."""
+        points = self._points.pop(player_id, None)
+        if points is None:
+            return
+        self.version += 1
+        bucket = self._buckets[points]
+        bucket.remove(player_id)
+        if not bucket:
+            del self._buckets[points]
+        self._add(points, -1)
+
+    def rank(self, player_id: str) -> int:
+        """Global rank of a player: 1 + number of players with more points (ties share a rank)."""
+        return len(self._points) - self._count_up_to(self._points[player_id]) + 1
+
+    def position(self, player_id: str) -> int:
+        """1-based position of a player in the leaderboard, ties ordered by id."""
+        points = self._points[player_id]
+        bucket = self._buckets[points]
+        above = len(self._points) - self._count_up_to(points)
+        return above + bucket.index(player_id) + 1
+
+    def at(self, position: int) -> tuple:
+        """
+        Get the player at a 1-based position.
+
+        Returns:
+            tuple: (player_id, points)
+        """
+        points = self._kth_value(len(self._points) - position + 1)
+        above = len(self._points) - self._count_up_to(points)
+        return self._buckets[points][position - above - 1], points
+
+    def around(self, player_id: str, k: int = 1) -> list:
+        """
+        Get the k players ranked above and below a player, the player included.
+
+        Returns:
+            list: (position, player_id, points) tuples, best first
+        """
+        center = self.position(player_id)
+        first = max(1, center - k)
+        last = min(len(self._points), center + k)
+        return [(pos, *self.at(pos)) for pos in range(first, last + 1)]
+
+    def top(self, limit: int) -> list:
+        """
+        Get the best players.
+
+        Returns:
+            list: (player_id, points) tuples, best first
+        """
+        return [self.at(pos) for pos in range(1, min(limit, len(self._points)) + 1)]
@@ -4,33 +4,32 @@ Cemantix Game Ranking System Implementation
 This module implements the ranking system documented in ranking.txt
 """
 
+import asyncio
+import time
 from pathlib import Path
+from core.metrics import LatencyStats
 from ranking_db import RankingDatabase
-from ranking_config import Rank, Tier, RankingConfig, RankEmoji
+from leaderboard import Leaderboard
+from ranking_config import Rank, Tier, RankEmoji, DEFAULT_CONFIG
 
 class PlayerRank:
-    def __init__(self):
-        self.rank = Rank.BRONZE
-        self.tier = Tier.III
-        self.points = 0
-        
-        # Performance weights - attempts are most important
-        self._w1 = RankingConfig.ACCURACY_WEIGHT
-        self._w2 = RankingConfig.ATTEMPTS_WEIGHT
-        self._w3 = RankingConfig.TIME_WEIGHT
-        self._w4 = RankingConfig.DIFFICULTY_WEIGHT
-        
-        # ELO constants
-        self._K = RankingConfig.K_FACTOR
-        self._S_mean = RankingConfig.EXPECTED_PERFORMANCE
-        
-        # Performance thresholds
-        self._penalty_threshold = RankingConfig.PENALTY_THRESHOLD
-        self._penalty_multiplier = RankingConfig.PENALTY_MULTIPLIER
-        self._bonus_threshold = RankingConfig.BONUS_THRESHOLD
-        self._bonus_multiplier = RankingConfig.BONUS_MULTIPLIER
-        
-        self.shadow_mmr = RankingConfig.EXPECTED_PERFORMANCE  # Initialize shadow MMR
+    """
+    Ranking state of one player. Only the per-player fields are stored, the
+    weights and thresholds are read from the shared `config`, so loading a
+    million players costs five slots each.
+    """
+
+    __slots__ = ("rank", "tier", "points", "games_played", "shadow_mmr")
+
+    config = DEFAULT_CONFIG  # RankingConfig shared by every player
+
+    def __init__(self, rank: Rank = Rank.BRONZE, tier: Tier = Tier.III, points: int = 0,
+                 games_played: int = 0, shadow_mmr: float = None):
+        self.rank = rank
+        self.tier = tier
+        self.points = points
+        self.games_played = games_played
+        self.shadow_mmr = self.config.EXPECTED_PERFORMANCE if shadow_mmr is None else shadow_mmr
 
     def calculate_performance_score(self, accuracy: float, attempts: int, time_taken: float, difficulty: float) -> float:
         """
@@ -56,10 +55,11 @@ class PlayerRank:
         normalized_difficulty = (difficulty - 1) / 4  # Convert 1-5 to 0-1 range
         
         # Calculate performance score S
-        S = (accuracy * self._w1 + 
-             normalized_attempts * self._w2 +
-             normalized_time * self._w3 +
-             normalized_difficulty * self._w4)
+        config = self.config
+        S = (accuracy * config.ACCURACY_WEIGHT +
+             normalized_attempts * config.ATTEMPTS_WEIGHT +
+             normalized_time * config.TIME_WEIGHT +
+             normalized_difficulty * config.DIFFICULTY_WEIGHT)
         
         return max(0.0, min(1.0, S))  # Clamp between 0 and 1
 
@@ -78,15 +78,16 @@ class PlayerRank:
         """
         
         S = self.calculate_performance_score(accuracy, attempts, time_taken, difficulty)
+        config = self.config
         
         # Calculate base ELO change based on performance relative to shadow MMR
-        delta_elo = self._K * (S - self.shadow_mmr)
+        delta_elo = config.K_FACTOR * (S - self.shadow_mmr)
         
         # Apply multipliers based on performance
-        if S < self._penalty_threshold:
-            delta_elo *= self._penalty_multiplier
-        elif S > self._bonus_threshold:
-            delta_elo *= self._bonus_multiplier
+        if S < config.PENALTY_THRESHOLD:
+            delta_elo *= config.PENALTY_MULTIPLIER
+        elif S > config.BONUS_THRESHOLD:
+            delta_elo *= config.BONUS_MULTIPLIER
             
         # Additional bonus for exceptional attempts (≤ 5)
         if attempts <= 5:
@@ -104,24 +105,10 @@ class PlayerRank:
         # Empêcher les points de descendre en dessous de 0 (Bronze III)
         self.points = max(0, self.points + points)
         
-        # Find the appropriate rank and tier based on total points
+        # Find the appropriate rank and tier based on total points, a bisect in the compiled thresholds
         current_rank = self.rank
         current_tier = self.tier
-        
-        for (rank, tier), threshold in sorted(
-            RankingConfig.RANK_THRESHOLDS.items(),
-            key=lambda x: x[1],
-            reverse=True
-        ):
-            if self.points >= threshold:
-                self.rank = rank
-                self.tier = tier
-                break
-        
-        # S'assurer que le rang minimum est Bronze III
-        if self.points == 0:
-            self.rank = Rank.BRONZE
-            self.tier = Tier.III
+        self.rank, self.tier = self.config.level(self.points)
         
         # Return True if rank changed
         return (current_rank, current_tier) != (self.rank, self.tier)
@@ -135,78 +122,225 @@ class PlayerRank:
         """
         return f"{RankEmoji.get_emoji(self.rank)} {self.rank.value} {self.tier.name}"
 
-class RankingSystem:
+# Partition of the rankings migrated from the global table, see ranking_db.py
+LEGACY_GUILD = ""
+
+
+class GuildRanking:
+    """Players and leaderboard of one guild."""
+
+    __slots__ = ("players", "leaderboard")
+
     def __init__(self):
         self.players = {}  # player_id: PlayerRank
+        self.leaderboard = Leaderboard()  # Players ordered by points, kept in sync with self.players
+
+    def load(self, rows):
+        """Fill an empty guild from (discord_id, rank, tier, points, shadow_mmr, games_played) rows."""
+        self.players = {
+            discord_id: PlayerRank(Rank[rank], Tier(tier), points, games_played, shadow_mmr)
+            for discord_id, rank, tier, points, shadow_mmr, games_played in rows
+        }
+        self.leaderboard.fill((discord_id, player.points) for discord_id, player in self.players.items())
+
+
+class RankingSystem:
+    # Write-behind: dirty players are saved together every FLUSH_INTERVAL seconds,
+    # or as soon as FLUSH_THRESHOLD of them are waiting
+    FLUSH_INTERVAL = 10.0
+    FLUSH_THRESHOLD = 100
+
+    def __init__(self):
+        self.guilds = {}  # guild_id: GuildRanking, a query only touches the players of its guild
         self.db = RankingDatabase()
-        self._load_players()
+        self._dirty = {}  # (guild_id, player_id): games played since the last flush
+        self._new_games = []  # (guild_id, player_id, game_data) finished games not saved yet
+        self._adopted = []  # (guild_id, player_id) legacy players moved to a guild, not saved yet
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        self._flush_tasks = set()  # Threshold flushes, referenced until done
+        self.flush_latency = LatencyStats()
+        self.last_batch_size = 0
+
+    async def load(self):
+        """Open the database, load all players into memory and start the periodic flush."""
+        await self.db.run(self.db.init_database)
+        await self._load_players()
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        """Flush every pending change and close the database."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            await self.flush()
+        finally:
+            # The DB thread and its connection are released even if the last flush failed
+            await self.db.close()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Failed to save Cemantix rankings: {e}")
+
+    async def flush(self):
+        """Save every dirty player in one transaction."""
+        async with self._flush_lock:
+            if not self._dirty and not self._new_games:
+                return
+            dirty, self._dirty = self._dirty, {}
+            games, self._new_games = self._new_games, []
+            adopted, self._adopted = self._adopted, []
+            batch = []
+            for (guild_id, player_id), new_games in dirty.items():
+                player = self.guilds[guild_id].players[player_id]
+                batch.append((guild_id, player_id, {
+                    'rank': player.rank.name,
+                    'tier': player.tier.value,
+                    'points': player.points,
+                    'shadow_mmr': player.shadow_mmr,
+                    'new_games': new_games
+                }))
+
+            start = time.perf_counter()
+            try:
+                await self.db.run(self.db.save_batch, batch, games, adopted)
+            except Exception:
+                # Put the batch back so no game increment is lost
+                for key, new_games in dirty.items():
+                    self._dirty[key] = self._dirty.get(key, 0) + new_games
+                self._new_games[:0] = games
+                self._adopted[:0] = adopted
+                raise
+            self.flush_latency.record(time.perf_counter() - start)
+            self.last_batch_size = len(batch)
         
-    def _load_players(self):
+    async def _load_players(self):
         """Load all players from database into memory."""
-        player_data = self.db.load_players()
-        for discord_id, data in player_data.items():
-            player = PlayerRank()
-            player.rank = Rank[data['rank']]
-            player.tier = Tier(data['tier'])
-            player.points = data['points']
-            player.shadow_mmr = data['shadow_mmr']
-            self.players[discord_id] = player
+        guild_rows = await self.db.run(self.db.load_players)
+        for guild_id, rows in guild_rows.items():
+            self.guild(guild_id).load(rows)
+
+    def guild(self, guild_id: str) -> GuildRanking:
+        """Get the rankings of a guild, created empty on first use."""
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            guild = self.guilds[guild_id] = GuildRanking()
+        return guild
             
-    def save_player(self, player_id: str):
-        """Save player's current rank data to database."""
-        player = self.players[player_id]
-        player_data = {
-            'rank': player.rank.name,
-            'tier': player.tier.value,
-            'points': player.points,
-            'shadow_mmr': player.shadow_mmr
-        }
-        self.db.save_player(player_id, player_data)
+    def _flush_if_full(self):
+        """Start a flush right away once enough changes are waiting."""
+        full = max(len(self._dirty), len(self._new_games)) >= self.FLUSH_THRESHOLD
+        if full and not self._flush_lock.locked():
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    def record_game(self, guild_id: str, player_id: str, game_data: dict):
+        """
+        Queue a finished game for the games history, saved with the next flush.
+
+        Args:
+            guild_id: ID of the guild the game was played in
+            player_id: ID of the player who found the word
+            game_data: Dictionary with word, mode, attempts, time_taken, difficulty and accuracy
+        """
+        self._new_games.append((guild_id, player_id, game_data))
+        self._flush_if_full()
+
+    def save_player(self, guild_id: str, player_id: str, new_games: int = 0):
+        """
+        Queue the player's current rank data for the next database flush.
+
+        Args:
+            guild_id: ID of the guild of the ranking
+            player_id: ID of player to save
+            new_games: Games played since the previous save
+        """
+        key = (guild_id, player_id)
+        self._dirty[key] = self._dirty.get(key, 0) + new_games
+        self._flush_if_full()
             
-    def get_player_stats(self, player_id: str) -> dict:
-        """Get complete player statistics including global rank."""
-        if player_id not in self.players:
-            self.add_player(player_id)
+    def get_player_stats(self, guild_id: str, player_id: str) -> dict:
+        """Get complete player statistics including rank within the guild."""
+        guild = self.guild(guild_id)
+        if player_id not in guild.players:
+            self.add_player(guild_id, player_id)
             
-        db_stats = self.db.get_player_stats(player_id)
-        
+        player = guild.players[player_id]
         return {
-            'rank': self.players[player_id].get_rank_display(),
-            'points': self.players[player_id].points,
-            'global_rank': db_stats['global_rank'],
-            'games_played': db_stats['games_played'],
-            'shadow_mmr': self.players[player_id].shadow_mmr
+            'rank': player.get_rank_display(),
+            'points': player.points,
+            'global_rank': guild.leaderboard.rank(player_id),
+            'games_played': player.games_played,
+            'shadow_mmr': player.shadow_mmr
         }
             
-    def get_nearby_players(self, player_id: str, range: int = 1) -> list:
-        """Get players ranked near the specified player."""
-        return self.db.get_nearby_players(player_id, range)
+    def get_nearby_players(self, guild_id: str, player_id: str, range: int = 1) -> list:
+        """
+        Get players of the guild ranked near the specified player.
+
+        Returns:
+            list: (position, discord_id, grade, tier, points) tuples, best first
+        """
+        guild = self.guild(guild_id)
+        if player_id not in guild.leaderboard:
+            return []
+        return [
+            (position, pid, guild.players[pid].rank.name, guild.players[pid].tier.value, points)
+            for position, pid, points in guild.leaderboard.around(player_id, range)
+        ]
             
-    def get_top_players(self, limit: int = 3) -> list:
-        """Get top ranked players."""
-        return self.db.get_top_players(limit)
+    def get_top_players(self, guild_id: str, limit: int = 3) -> list:
+        """
+        Get top ranked players of the guild.
 
-    def add_player(self, player_id: str):
-        """Add new player to ranking system"""
-        self.players[player_id] = PlayerRank()
-        self.save_player(player_id)
+        Returns:
+            list: (discord_id, grade, tier, points) tuples, best first
+        """
+        guild = self.guild(guild_id)
+        return [
+            (pid, guild.players[pid].rank.name, guild.players[pid].tier.value, points)
+            for pid, points in guild.leaderboard.top(limit)
+        ]
+
+    def add_player(self, guild_id: str, player_id: str):
+        """Add new player to the guild ranking, carrying over their legacy ranking if they have one"""
+        legacy = self.guilds.get(LEGACY_GUILD)
+        if guild_id != LEGACY_GUILD and legacy is not None and player_id in legacy.players:
+            # Rankings from before per-guild rankings go to the first guild the player plays in
+            player = legacy.players.pop(player_id)
+            legacy.leaderboard.remove(player_id)
+            self._adopted.append((guild_id, player_id))
+        else:
+            player = PlayerRank()
+
+        guild = self.guild(guild_id)
+        guild.players[player_id] = player
+        guild.leaderboard.update(player_id, player.points)
+        self.save_player(guild_id, player_id)
         
-    def update_player_rank(self, player_id: str, game_data: dict):
+    def update_player_rank(self, guild_id: str, player_id: str, game_data: dict):
         """
         Update player's rank based on game performance
         
         Args:
+            guild_id: ID of the guild the game was played in
             player_id: ID of player to update
             game_data: Dictionary containing game performance metrics
                       Required keys: accuracy, attempts, time_taken, difficulty
         Returns:
             tuple: (points_earned, new_rank_display, rank_changed)
         """
-        if player_id not in self.players:
-            self.add_player(player_id)
+        guild = self.guild(guild_id)
+        if player_id not in guild.players:
+            self.add_player(guild_id, player_id)
             
-        player = self.players[player_id]
-        
+        player = guild.players[player_id]
         # Calculate ELO change
         points = player.calculate_elo(
             game_data['accuracy'],
@@ -227,5 +361,8 @@ class RankingSystem:
         
         # Update rank and check if it changed
         rank_changed = player.update_rank(points)
+        player.games_played += 1
+        guild.leaderboard.update(player_id, player.points)
+        self.save_player(guild_id, player_id, new_games=1)
         
         return (points, player.get_rank_display(), rank_changed)
@@ -1,3 +1,4 @@
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, Tuple
@@ -64,4 +65,18 @@ class RankingConfig:
     BONUS_MULTIPLIER: float = 2.0
     
     # Rank thresholds
-    RANK_THRESHOLDS = _default_rank_thresholds() 
\ No newline at end of file
+    RANK_THRESHOLDS = _default_rank_thresholds()
+
+    def __post_init__(self):
+        # Compiled once: ascending thresholds and the (rank, tier) each one reaches, for bisect lookups
+        levels = sorted(self.RANK_THRESHOLDS.items(), key=lambda item: item[1])
+        self.thresholds = [threshold for _, threshold in levels]
+        self.levels = [level for level, _ in levels]
+
+    def level(self, points: int) -> Tuple[Rank, Tier]:
+        """Get the (rank, tier) reached with a points total, Bronze III below the first threshold."""
+        return self.levels[max(0, bisect_right(self.thresholds, points) - 1)]
+
+
+# Configuration used by the bot, shared by every PlayerRank
+DEFAULT_CONFIG = RankingConfig() 
\ No newline at end of file
@@ -4,71 +4,114 @@ from db_context import DatabaseContext
 from sql_queries import *
 
 class RankingDatabase:
+    """
+    Queries of the ranking database. The methods are blocking and must run on
+    the DB thread: call them through run() from async code.
+    """
+
     def __init__(self):
         self.db_path = Path(__file__).parent / "data/rankings.db"
         self.db_context = DatabaseContext(self.db_path)
-        self._init_database()
 
-    def _init_database(self):
+    async def run(self, method, *args):
+        """Run one of the query methods on the DB thread."""
+        return await self.db_context.run(method, *args)
+
+    async def close(self):
+        await self.db_context.close()
+
+    def init_database(self):
         """Initialize the SQLite database and create tables if they don't exist."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         with self.db_context.get_cursor() as cursor:
-            cursor.execute(CREATE_RANKINGS_TABLE)
+            cursor.execute(CREATE_GUILD_RANKINGS_TABLE)
+            cursor.execute(CREATE_GUILD_POINTS_INDEX)
+            cursor.execute(CREATE_GAMES_TABLE)
+            self._migrate_global_rankings(cursor)
+            cursor.execute(CREATE_GAMES_PLAYER_INDEX)
+
+    def _migrate_global_rankings(self, cursor):
+        """Move the rankings of the versions before per-guild rankings to the legacy partition ('')."""
+        cursor.execute("PRAGMA table_info(games)")
+        if "guild_id" not in (column[1] for column in cursor.fetchall()):
+            cursor.execute(ADD_GAMES_GUILD_COLUMN)
+            cursor.execute(DROP_GAMES_LEGACY_INDEX)
+
+        cursor.execute(TABLE_EXISTS, ("player_rankings",))
+        if cursor.fetchone():
+            cursor.execute(MIGRATE_PLAYER_RANKINGS)
+            cursor.execute(RENAME_PLAYER_RANKINGS)
 
     def load_players(self):
-        """Load all players from database into memory."""
-        players = {}
+        """
+        Load all players from database into memory.
+
+        Returns:
+            dict: guild_id -> list of (discord_id, rank, tier, points, shadow_mmr, games_played) rows
+        """
+        guilds = {}
         with self.db_context.get_cursor() as cursor:
             cursor.execute(GET_PLAYERS)
-            for discord_id, rank_str, tier, points, shadow_mmr in cursor.fetchall():
-                players[discord_id] = {
-                    'rank': rank_str,
-                    'tier': tier,
-                    'points': points,
-                    'shadow_mmr': shadow_mmr
-                }
-        return players
+            for guild_id, *row in cursor:
+                guilds.setdefault(guild_id, []).append(row)
+        return guilds
 
-    def save_player(self, player_id: str, player_data: dict):
-        """Save player's current rank data to database."""
-        with self.db_context.get_cursor() as cursor:
-            cursor.execute(SAVE_PLAYER, (
-                player_id,
-                player_data['rank'],
-                player_data['tier'],
-                player_data['points'],
-                player_data['shadow_mmr'],
-                player_data['rank'],
-                player_data['tier'],
-                player_data['points'],
-                player_data['shadow_mmr']
-            ))
+    def save_batch(self, players: list, games: list, adopted: list = ()):
+        """
+        Save a batch of players' rank data and finished games in a single transaction.
 
-    def get_player_stats(self, player_id: str) -> dict:
-        """Get complete player statistics including global rank."""
+        Args:
+            players: (guild_id, player_id, player_data) tuples, player_data holding rank, tier,
+                     points, shadow_mmr and new_games (games played since the last save)
+            games: (guild_id, player_id, game_data) tuples, game_data holding word, mode, attempts,
+                   time_taken, difficulty and accuracy
+            adopted: Optional; (guild_id, player_id) tuples of legacy players moved to a guild,
+                     applied before the players are saved
+        """
         with self.db_context.get_cursor() as cursor:
-            cursor.execute(GET_PLAYER_RANK, (player_id,))
-            global_rank = cursor.fetchone()[0]
-
-            cursor.execute('SELECT games_played, shadow_mmr FROM player_rankings WHERE discord_id = ?', (player_id,))
-            result = cursor.fetchone()
-            games_played = result[0] if result else 0
-            shadow_mmr = result[1] if result else 0.5
+            cursor.executemany(ADOPT_LEGACY_PLAYER, adopted)
+            cursor.executemany(ADOPT_LEGACY_GAMES, adopted)
+            cursor.executemany(INSERT_GAME, [
+                (
+                    guild_id,
+                    player_id,
+                    game_data['word'],
+                    game_data['mode'],
+                    game_data['attempts'],
+                    game_data['time_taken'],
+                    game_data['difficulty'],
+                    game_data['accuracy']
+                )
+                for guild_id, player_id, game_data in games
+            ])
+            cursor.executemany(SAVE_PLAYER, [
+                (
+                    guild_id,
+                    player_id,
+                    player_data['rank'],
+                    player_data['tier'],
+                    player_data['points'],
+                    player_data['new_games'],
+                    player_data['shadow_mmr']
+                )
+                for guild_id, player_id, player_data in players
+            ])
 
-            return {
-                'global_rank': global_rank,
-                'games_played': games_played,
-                'shadow_mmr': shadow_mmr
-            }
-
-    def get_nearby_players(self, player_id: str, range: int = 1) -> list:
-        """Get players ranked near the specified player."""
+    def load_games(self, mode: str) -> list:
+        """Load every game of a mode in play order, as (guild_id, discord_id, attempts, duration, difficulty, accuracy)."""
         with self.db_context.get_cursor() as cursor:
-            cursor.execute(GET_NEARBY_PLAYERS, (player_id, range, range))
+            cursor.execute(GET_GAMES_BY_MODE, (mode,))
             return cursor.fetchall()
 
-    def get_top_players(self, limit: int = 3) -> list:
-        """Get top ranked players."""
+    def set_players(self, players: list):
+        """
+        Overwrite the ranking data of a batch of players in a single transaction.
+
+        Args:
+            players: (guild_id, player_id, rank, tier, points, shadow_mmr) tuples
+        """
         with self.db_context.get_cursor() as cursor:
-            cursor.execute(GET_TOP_PLAYERS, (limit,))
-            return cursor.fetchall() 
\ No newline at end of file
+            cursor.executemany(SET_PLAYER_RANKING, [
+                (rank, tier, points, shadow_mmr, guild_id, player_id)
+                for guild_id, player_id, rank, tier, points, shadow_mmr in players
+            ])
@@ -0,0 +1,184 @@
+"""
+Offline ranking replay for the Cemantix game plugin.
+Recomputes every player's points, rank and shadow MMR in each guild from the games history, so RankingConfig changes can be tried without resetting anyone.
+
+Usage: python ranking_replay.py [--set K_FACTOR=40 ...] [--apply]
+Stop the bot before using --apply, it overwrites the stored rankings.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import dataclasses
+import time
+
+# Add to python path to use local plugin files dependencies
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
+
+import numpy as np
+
+from ranking_config import Rank, RankingConfig
+
+# Same moving average as RankingSystem.update_player_rank
+MMR_DECAY = 0.95
+
+
+def performance_scores(config, accuracy, attempts, time_taken, difficulty):
+    """Vectorized PlayerRank.calculate_performance_score over NumPy arrays."""
+    normalized_attempts = np.where(
+        attempts <= 5, 1.0, np.clip(20.0 / np.maximum(attempts, 1), 0.1, 0.8)
+    )
+    normalized_time = np.minimum(1.0, 3600.0 / np.maximum(time_taken, 1))
+    normalized_difficulty = (difficulty - 1) / 4
+
+    S = (accuracy * config.ACCURACY_WEIGHT +
+         normalized_attempts * config.ATTEMPTS_WEIGHT +
+         normalized_time * config.TIME_WEIGHT +
+         normalized_difficulty * config.DIFFICULTY_WEIGHT)
+    return np.clip(S, 0.0, 1.0)
+
+
+def replay(player_ids, accuracy, attempts, time_taken, difficulty, config=None) -> dict:
+    """
+    Replay a games history and compute the resulting ranking of every player.
+
+    Performance scores and multipliers are computed for all games at once. The
+    only sequential part is each player's own game order, replayed one step at
+    a time for all players together (step k handles every player's k-th game).
+
+    Args:
+        player_ids: Sequence of player ids, one per game, in play order
+        accuracy, attempts, time_taken, difficulty: Per-game sequences, same order
+        config: Optional; RankingConfig instance, defaults to the current one
+
+    Returns:
+        dict: player_id -> (rank name, tier value, points, shadow_mmr, games played)
+    """
+    config = config or RankingConfig()
+    players, codes = np.unique(np.asarray(player_ids), return_inverse=True)
+    attempts = np.asarray(attempts, dtype=np.float64)
+
+    S = performance_scores(
+        config,
+        np.asarray(accuracy, dtype=np.float64),
+        attempts,
+        np.asarray(time_taken, dtype=np.float64),
+        np.asarray(difficulty, dtype=np.float64),
+    )
+    multiplier = np.where(
+        S < config.PENALTY_THRESHOLD,
+        config.PENALTY_MULTIPLIER,
+        np.where(S > config.BONUS_THRESHOLD, config.BONUS_MULTIPLIER, 1.0),
+    )
+    multiplier = multiplier * np.where(attempts <= 5, 2.5, 1.0)
+
+    # Group games by player, keeping play order inside a player
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=len(players))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    S, multiplier = S[order], multiplier[order]
+
+    # Players with the most games first, so the players active at step k are a prefix
+    by_count = np.argsort(-counts, kind="stable")
+    sorted_counts = counts[by_count]
+    sorted_starts = starts[by_count]
+
+    points = np.zeros(len(players), dtype=np.int64)
+    mmr = np.full(len(players), config.EXPECTED_PERFORMANCE, dtype=np.float64)
+    for k in range(int(sorted_counts[0]) if len(players) else 0):
+        active = int(np.searchsorted(-sorted_counts, -k, side="left"))
+        idx = sorted_starts[:active] + k
+        delta = np.round(config.K_FACTOR * (S[idx] - mmr[:active]) * multiplier[idx])
+        points[:active] = np.maximum(0, points[:active] + delta.astype(np.int64))
+        mmr[:active] = mmr[:active] * MMR_DECAY + S[idx] * (1 - MMR_DECAY)
+
+    # Rank and tier lookup in the compiled thresholds, as RankingConfig.level() for every player at once
+    level = np.maximum(0, np.searchsorted(np.array(config.thresholds), points, side="right") - 1)
+
+    result = {}
+    for i, player in enumerate(by_count):
+        rank, tier = config.levels[level[i]]
+        result[str(players[player])] = (
+            rank.name, tier.value, int(points[i]), float(mmr[i]), int(sorted_counts[i])
+        )
+    return result
+
+
+def _parse_overrides(pairs: list) -> dict:
+    fields = {f.name for f in dataclasses.fields(RankingConfig)}
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        if name not in fields:
+            raise SystemExit(f"Unknown RankingConfig field: {name}")
+        overrides[name] = float(value)
+    return overrides
+
+
+async def _load_games():
+    from ranking_db import RankingDatabase
+
+    db = RankingDatabase()
+    try:
+        await db.run(db.init_database)
+        return await db.run(db.load_games, "ranked")
+    finally:
+        await db.close()
+
+
+async def _apply(result: dict):
+    from ranking_db import RankingDatabase
+
+    db = RankingDatabase()
+    try:
+        rows = [
+            (guild_id, pid, rank, tier, points, mmr)
+            for (guild_id, pid), (rank, tier, points, mmr, _) in result.items()
+        ]
+        await db.run(db.set_players, rows)
+    finally:
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the Cemantix ranked games with another RankingConfig.")
+    parser.add_argument("--set", dest="overrides", nargs="*", default=[], metavar="FIELD=VALUE",
+                        help="RankingConfig fields to override, e.g. K_FACTOR=40")
+    parser.add_argument("--apply", action="store_true", help="Write the replayed rankings to the database")
+    args = parser.parse_args()
+
+    config = RankingConfig(**_parse_overrides(args.overrides))
+    games = asyncio.run(_load_games())
+    if not games:
+        print("No ranked game in the history.")
+        return
+
+    # Rankings are kept per guild, each guild history is replayed on its own
+    by_guild = {}
+    for guild_id, *game in games:
+        by_guild.setdefault(guild_id, []).append(game)
+
+    start = time.perf_counter()
+    result = {}  # (guild_id, player_id): replayed ranking
+    for guild_id, guild_games in by_guild.items():
+        player_ids, attempts, durations, difficulties, accuracies = zip(*guild_games)
+        for player_id, ranking in replay(player_ids, accuracies, attempts, durations, difficulties, config).items():
+            result[(guild_id, player_id)] = ranking
+    print(f"⚙️  Replayed {len(games)} games of {len(result)} players in {len(by_guild)} guilds "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    distribution = {rank.name: 0 for rank in Rank}
+    for rank, _, _, _, _ in result.values():
+        distribution[rank] += 1
+    for rank, count in distribution.items():
+        print(f"{rank:<10} {count:>8} ({count / len(result):.1%})")
+
+    if args.apply:
+        asyncio.run(_apply(result))
+        print("✅ Rankings overwritten.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Module related to the scoring backend of the Cemantix game plugin.
+Runs the similarity work on an executor so the event loop (and every other plugin) never waits for NumPy.
+"""
+
+import asyncio
+import functools
+import itertools
+import json
+import multiprocessing
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from core.metrics import LatencyStats
+from daily_table import load_daily, write_daily
+from embedding_store import EmbeddingStore
+from similarity_server import LINE_LIMIT, SOCKET_PATH
+from similarity_table import SimilarityTable
+
+
+class SimilarityBackend:
+    """
+    Interface of the Cemantix scoring backends.
+    prepare() builds the table of a mystery word, score() looks guesses up in it.
+    """
+
+    async def prepare(self, word: str) -> SimilarityTable:
+        raise NotImplementedError
+
+    async def prepare_daily(self, day, word: str) -> SimilarityTable:
+        """Get the table of a day's shared word, from its disk cache when it exists."""
+        raise NotImplementedError
+
+    async def score(self, table: SimilarityTable, words: list) -> list:
+        """
+        Score guesses against a prepared table.
+
+        Returns:
+            list: One (similarity in per mille, proximity rank) tuple per word, None for unknown words
+        """
+        return table.lookup_many(words)
+
+    async def closest(self, table: SimilarityTable, k: int = 10) -> list:
+        """
+        Get the words closest to the target of a prepared table, exactly ranked.
+
+        Returns:
+            list: (word, similarity in per mille) tuples, closest first
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+    def close(self):
+        pass
+
+
+# Store of a process pool worker, memory-mapped once per process by _init_worker
+_worker_store = None
+
+
+def _init_worker(precision: str):
+    global _worker_store
+    _worker_store = EmbeddingStore.load(precision=precision)
+
+
+def _build_arrays(word: str):
+    table = SimilarityTable.build(_worker_store, word)
+    return table.scores, table.ranks
+
+
+def _write_daily(day, word: str):
+    return write_daily(_worker_store, day, word)
+
+
+class ExecutorSimilarityBackend(SimilarityBackend):
+    """
+    Build similarity tables on a thread or process pool with bounded concurrency.
+
+    Threads are enough on most hosts since NumPy releases the GIL during the
+    product; processes isolate the work completely at the cost of shipping the
+    resulting arrays back.
+    """
+
+    def __init__(self, game, kind: str = "thread", workers: int = 2, max_concurrency: int = None):
+        """
+        Args:
+            game: GameManager owning the embedding store
+            kind: "thread" or "process"
+            workers: Number of pool workers
+            max_concurrency: Optional; Maximum number of jobs handed to the pool at once, defaults to workers
+        """
+        self.game = game
+        self.kind = kind
+        self.workers = workers
+
+        if kind == "process":
+            # Never fork the running bot: its threads may hold locks the child would inherit.
+            # Workers start clean and memory-map the store themselves in _init_worker
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context,
+                initializer=_init_worker, initargs=(game.model.precision,)
+            )
+        elif kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cemantix")
+        else:
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self._slots = asyncio.Semaphore(max_concurrency or workers)
+        self.pending = 0  # Jobs submitted and not finished yet, waiting ones included
+        self.wait = LatencyStats()  # Time spent waiting for a free slot
+        self.latency = LatencyStats()  # Time spent in the pool
+
+        # Games sharing a mystery word share its table, dropped once no game uses it
+        self.tables = weakref.WeakValueDictionary()
+        self.daily = None  # Memory-mapped table of the current day
+        self.daily_day = None
+        self._daily_tasks = {}  # day: task writing its table, shared by concurrent games
+
+    async def _run(self, fn, *args):
+        self.pending += 1
+        queued = time.perf_counter()
+        try:
+            async with self._slots:
+                self.wait.record(time.perf_counter() - queued)
+                with self.latency.measure():
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def prepare(self, word: str) -> SimilarityTable:
+        table = self.tables.get(word)
+        if table is None:
+            if self.kind == "process":
+                scores, ranks = await self._run(_build_arrays, word)
+                table = SimilarityTable(word, self.game.model.index, scores, ranks)
+            else:
+                table = await self._run(SimilarityTable.build, self.game.model, word)
+            self.tables[word] = table
+        return table
+
+    async def prepare_daily(self, day, word: str) -> SimilarityTable:
+        if self.daily_day == day:
+            return self.daily
+
+        task = self._daily_tasks.get(day)
+        if task is None:
+            task = asyncio.create_task(self._prepare_daily(day, word))
+            self._daily_tasks[day] = task
+        # Shielded, a game leaving does not cancel the write for the others
+        return await asyncio.shield(task)
+
+    async def _prepare_daily(self, day, word: str) -> SimilarityTable:
+        # Building and writing are skipped by the worker when the day is already on disk
+        try:
+            if self.kind == "process":
+                await self._run(_write_daily, day, word)
+            else:
+                await self._run(functools.partial(write_daily, self.game.model), day, word)
+        finally:
+            del self._daily_tasks[day]
+        table = load_daily(day, self.game.model.index)
+        if table is None:
+            raise RuntimeError(f"Daily table of {day} could not be written")
+
+        if self.daily_day is None or day > self.daily_day:
+            self.daily, self.daily_day = table, day
+        return table
+
+    async def closest(self, table: SimilarityTable, k: int = 10) -> list:
+        # The table lives in this process, the partition runs on the loop's default executor
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, table.closest, k)
+        return [(self.game.model.words[row], score) for row, score in rows]
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "precision": self.game.model.precision,
+            "workers": self.workers,
+            "pending": self.pending,
+            "wait": self.wait.summary(),
+            "latency": self.latency.summary(),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RemoteTable:
+    """Handle of a table held by the similarity server, only its target is known locally."""
+
+    __slots__ = ("target", "__weakref__")
+
+    def __init__(self, target: str):
+        self.target = target
+
+
+class RemoteSimilarityBackend(SimilarityBackend):
+    """
+    Client of similarity_server.py, for hosts running several bot processes.
+
+    One connection is kept open and shared by every game of the process.
+    Requests are pipelined: each one is written as soon as it is made, and a
+    reader task hands every response to its caller by request id, so a guess
+    never waits for another game's table build.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket_path = socket_path
+        self.precision = None  # Reported by the server on connection
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._connect_lock = asyncio.Lock()
+        self._ids = itertools.count()
+        self._pending = {}  # request id: Future of its response
+        self.wait = LatencyStats()  # Time spent (re)connecting
+        self.latency = LatencyStats()  # Request round trips
+        self.tables = weakref.WeakValueDictionary()
+        self.daily = None
+        self.daily_day = None
+
+    @classmethod
+    async def connect(cls, socket_path=SOCKET_PATH):
+        """Connect to a running server. Raises OSError if none listens on the socket."""
+        backend = cls(socket_path)
+        backend.precision = (await backend._request("info"))["precision"]
+        return backend
+
+    async def _ensure_connected(self) -> asyncio.StreamWriter:
+        """Get the writer of the open connection, connecting first if needed."""
+        async with self._connect_lock:
+            if self._writer is None:
+                with self.wait.measure():
+                    self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=LINE_LIMIT)
+                self._reader_task = asyncio.create_task(self._read_responses(self._reader, self._writer))
+            return self._writer
+
+    async def _read_responses(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        error = ConnectionError("Similarity server closed the connection")
+        try:
+            while line := await reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response["id"], None)
+                if future is None or future.done():
+                    continue  # Caller cancelled meanwhile
+                if "error" in response:
+                    future.set_exception(RuntimeError(response["error"]))
+                else:
+                    future.set_result(response["result"])
+        except (ConnectionError, ValueError) as e:
+            error = ConnectionError(f"Similarity server connection lost: {e}")
+        finally:
+            # Fail whatever is left, the next request reconnects
+            if self._writer is writer:
+                self._writer, self._reader = None, None
+            writer.close()
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _request(self, op: str, **fields):
+        # Kept locally, the reader task drops the shared writer when the connection is lost
+        writer = await self._ensure_connected()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        with self.latency.measure():
+            writer.write(json.dumps({"id": request_id, "op": op, **fields}, ensure_ascii=False).encode() + b"\n")
+            await writer.drain()
+            try:
+                return await future
+            finally:
+                self._pending.pop(request_id, None)
+
+    async def prepare(self, word: str) -> RemoteTable:
+        table = self.tables.get(word)
+        if table is None:
+            await self._request("prepare", target=word)
+            table = self.tables.setdefault(word, RemoteTable(word))
+        return table
+
+    async def prepare_daily(self, day, word: str) -> RemoteTable:
+        if self.daily_day == day:
+            return self.daily
+        await self._request("daily", target=word, day=day.isoformat())
+        table = RemoteTable(word)
+        if self.daily_day is None or day > self.daily_day:
+            self.daily, self.daily_day = table, day
+        return table
+
+    async def score(self, table: RemoteTable, words: list) -> list:
+        results = await self._request("score", target=table.target, words=words)
+        return [tuple(result) if result is not None else None for result in results]
+
+    async def closest(self, table: RemoteTable, k: int = 10) -> list:
+        results = await self._request("closest", target=table.target, k=k)
+        return [tuple(result) for result in results]
+
+    def stats(self) -> dict:
+        return {
+            "executor": f"socket {self.socket_path.name}",
+            "workers": 1,
+            "precision": self.precision,
+            "pending": len(self._pending),
+            "wait": self.wait.summary(),
+            "latency": self.latency.summary(),
+        }
+
+    def close(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._writer:
+            self._writer.close()
@@ -0,0 +1,198 @@
+"""
+Standalone similarity server for the Cemantix game plugin.
+Owns the embedding store and the similarity tables for every bot process of the host, which talk to it over a Unix domain socket.
+
+Usage: python similarity_server.py [--socket PATH] [--precision float32|float16|int8] [--workers N]
+
+Protocol: one JSON object per line in each direction. Requests carry an "id" echoed in
+their response, so a client can pipeline requests and match answers arriving out of order.
+    {"id": 1, "op": "info"}                                         -> {"id": 1, "result": {"precision": ..., "words": ...}}
+    {"id": 2, "op": "prepare", "target": "maison"}                  -> {"id": 2, "result": true}
+    {"id": 3, "op": "daily", "target": "maison", "day": "2025-01-01"} -> {"id": 3, "result": true}
+    {"id": 4, "op": "score", "target": "maison", "words": ["chat"]} -> {"id": 4, "result": [[312, 845]]}
+    {"id": 5, "op": "closest", "target": "maison", "k": 10}         -> {"id": 5, "result": [["logement", 702], ...]}
+Unknown words score null. A failed request gets {"id": ..., "error": "message"} instead.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import datetime
+import json
+import signal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add to python path to use local plugin files dependencies
+sys.path.append(os.path.dirname(__file__))
+
+from daily_table import load_daily, write_daily
+from embedding_store import EmbeddingStore
+from similarity_table import SimilarityTable
+
+SOCKET_PATH = Path(__file__).parent / "data/similarity.sock"
+
+# Longest request line accepted, a score batch of a few thousand words fits easily
+LINE_LIMIT = 1 << 20
+
+
+class SimilarityServer:
+    """Serve similarity tables to any number of clients, each table built once for all of them."""
+
+    def __init__(self, store, socket_path: Path = SOCKET_PATH, workers: int = 2, max_tables: int = 256):
+        """
+        Args:
+            store: EmbeddingStore holding the normalized vectors
+            socket_path: Optional; Path of the Unix domain socket
+            workers: Optional; Threads building tables
+            max_tables: Optional; Tables kept in memory, least recently used dropped first
+        """
+        self.store = store
+        self.socket_path = socket_path
+        self.max_tables = max_tables
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cemantix-server")
+        self.tables = OrderedDict()  # target: SimilarityTable, most recently used last
+        self.daily_tables = {}  # target: memory-mapped daily table, kept for the last days
+        self._building = {}  # target: task building its table, shared by concurrent requests
+        self._writing = {}  # (day, target): task writing its daily table, shared by concurrent requests
+
+    async def table(self, target: str) -> SimilarityTable:
+        """Get the table of a target, building it on the executor if needed."""
+        table = self.daily_tables.get(target)
+        if table is not None:
+            return table
+        table = self.tables.get(target)
+        if table is not None:
+            self.tables.move_to_end(target)
+            return table
+
+        task = self._building.get(target)
+        if task is None:
+            if target not in self.store:
+                raise KeyError(f"Unknown target word: {target}")
+            task = asyncio.create_task(self._build(target))
+            self._building[target] = task
+        # Shielded, a client leaving does not cancel the build for the others
+        return await asyncio.shield(task)
+
+    async def _build(self, target: str) -> SimilarityTable:
+        loop = asyncio.get_running_loop()
+        try:
+            table = await loop.run_in_executor(self.executor, SimilarityTable.build, self.store, target)
+        finally:
+            del self._building[target]
+        self.tables[target] = table
+        while len(self.tables) > self.max_tables:
+            self.tables.popitem(last=False)
+        return table
+
+    async def daily(self, day: datetime.date, target: str) -> SimilarityTable:
+        """Get the daily table of a day from its disk cache, writing it first if needed."""
+        key = (day, target)
+        task = self._writing.get(key)
+        if task is None:
+            task = asyncio.create_task(self._daily(day, target))
+            self._writing[key] = task
+        return await asyncio.shield(task)
+
+    async def _daily(self, day: datetime.date, target: str) -> SimilarityTable:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, write_daily, self.store, day, target)
+        finally:
+            del self._writing[(day, target)]
+        table = load_daily(day, self.store.index)
+        if table is None:
+            raise RuntimeError(f"Daily table of {day} could not be written")
+        # Keep today and yesterday, games started before midnight still use it
+        self.daily_tables[target] = table
+        while len(self.daily_tables) > 2:
+            del self.daily_tables[next(iter(self.daily_tables))]
+        return table
+
+    async def handle(self, request: dict):
+        """Run one request and return its result."""
+        op = request.get("op")
+        if op == "info":
+            return {"precision": self.store.precision, "words": len(self.store), "tables": len(self.tables)}
+        if op == "prepare":
+            await self.table(request["target"])
+            return True
+        if op == "daily":
+            await self.daily(datetime.date.fromisoformat(request["day"]), request["target"])
+            return True
+        if op == "score":
+            table = await self.table(request["target"])
+            return table.lookup_many(request["words"])
+        if op == "closest":
+            table = await self.table(request["target"])
+            loop = asyncio.get_running_loop()
+            rows = await loop.run_in_executor(self.executor, table.closest, int(request.get("k", 10)))
+            return [(self.store.words[row], score) for row, score in rows]
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def _answer(self, request: dict, writer: asyncio.StreamWriter):
+        try:
+            response = {"id": request.get("id"), "result": await self.handle(request)}
+        except Exception as e:
+            response = {"id": request.get("id"), "error": f"{type(e).__name__}: {e}"}
+        if not writer.is_closing():
+            writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                # Each request runs on its own, a slow table build never delays cached lookups
+                task = asyncio.create_task(self._answer(json.loads(line), writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # Client gone, or sent something that is not JSON
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self):
+        """Listen on the socket until cancelled."""
+        self.socket_path.unlink(missing_ok=True)  # Left by a previous run
+        server = await asyncio.start_unix_server(self._serve_client, path=self.socket_path, limit=LINE_LIMIT)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.socket_path.unlink(missing_ok=True)
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _serve_until_stopped(server: SimilarityServer):
+    # Stop cleanly on SIGTERM too, so the socket file is removed
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        await server.serve()
+    except asyncio.CancelledError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Cemantix similarity tables over a Unix domain socket.")
+    parser.add_argument("--socket", type=Path, default=SOCKET_PATH, help="Unix domain socket path")
+    parser.add_argument("--precision", default=os.getenv("CEMANTIX_VECTORS", "float32"),
+                        choices=("float32", "float16", "int8"), help="Precision of the word vectors")
+    parser.add_argument("--workers", type=int, default=2, help="Threads building tables")
+    args = parser.parse_args()
+
+    server = SimilarityServer(EmbeddingStore.load(precision=args.precision), args.socket, args.workers)
+    print(f"✅ Cemantix similarity server listening on {args.socket}")
+    asyncio.run(_serve_until_stopped(server))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Module related to the scoring of the Cemantix game plugin. Precomputes every word score against a mystery word."""
+
+import numpy as np
+
+# Number of closest words that get a proximity rank in the feedback, like the official game
+TOP_RANKS = 1000
+
+
+class SimilarityTable:
+    """
+    Per-mille score and proximity rank of every stored word against one mystery word.
+
+    Built with a single matrix-vector product when the mystery word is picked,
+    so each guess is a dictionary lookup instead of a vector operation.
+    """
+
+    def __init__(self, target: str, index: dict, scores: np.ndarray, ranks: np.ndarray):
+        self.target = target
+        self.index = index
+        self.scores = scores
+        self.ranks = ranks
+
+    @classmethod
+    def build(cls, store, target: str):
+        """
+        Score the whole store against a target word.
+
+        Args:
+            store: EmbeddingStore holding the normalized vectors
+            target: The mystery word
+
+        Returns:
+            SimilarityTable: The table for this target
+        """
+        similarities = store.dot(store.vector(target))
+
+        # Truncate like int(similarity * 1000) did for a single word
+        scores = np.clip(similarities * 1000, -1000, 1000).astype(np.int16)
+        # Float rounding can leave the target itself at 999
+        scores[store.index[target]] = 1000
+
+        # 1-based rank, the target itself being #1
+        order = np.argsort(-similarities, kind="stable")
+        rank_dtype = np.uint16 if len(order) <= np.iinfo(np.uint16).max else np.uint32
+        ranks = np.empty(len(order), dtype=rank_dtype)
+        ranks[order] = np.arange(1, len(order) + 1, dtype=rank_dtype)
+
+        return cls(target, store.index, scores, ranks)
+
+    def __contains__(self, word):
+        return word in self.index
+
+    def lookup_many(self, words: list) -> list:
+        """
+        Get the scores of several words with one indexed read of each array.
+
+        Returns:
+            list: One (similarity in per mille, proximity rank) tuple per word, None for unknown words
+        """
+        rows = [self.index.get(word) for word in words]
+        known = [row for row in rows if row is not None]
+        found = iter(zip(self.scores[known].tolist(), self.ranks[known].tolist()))
+        return [next(found) if row is not None else None for row in rows]
+
+    def closest(self, k: int) -> list:
+        """
+        Get the k best ranked words, the target itself excluded.
+
+        Returns:
+            list: (store index, similarity in per mille) tuples, closest first
+        """
+        count = min(k + 1, len(self.ranks))
+        rows = np.argpartition(self.ranks, count - 1)[:count]
+        rows = rows[np.argsort(self.ranks[rows], kind="stable")][1:]
+        return list(zip(rows.tolist(), self.scores[rows].tolist()))
+
+    def lookup(self, word):
+        """
+        Get the score of a word.
+
+        Returns:
+            tuple: (similarity in per mille, proximity rank) or None if the word is unknown
+        """
+        i = self.index.get(word)
+        if i is None:
+            return None
+        return int(self.scores[i]), int(self.ranks[i])
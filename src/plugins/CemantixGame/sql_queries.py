@@ -1,104 +1,159 @@
-# Query to create the main rankings table
+# Query to create the rankings table, partitioned by guild
 # Fields:
-# - discord_id: Player's Discord ID (primary key)
+# - guild_id: Discord ID of the guild the games were played in ('' for rows migrated from player_rankings)
+# - discord_id: Player's Discord ID
 # - rank: Player's rank title
 # - tier: Numerical tier within rank
 # - points: Total points earned
 # - games_played: Number of games completed
 # - last_game_date: Timestamp of most recent game
 # - shadow_mmr: Hidden matchmaking rating (0.0-1.0)
-CREATE_RANKINGS_TABLE = '''
-    CREATE TABLE IF NOT EXISTS player_rankings (
-        discord_id TEXT PRIMARY KEY,
+# WITHOUT ROWID stores the rows clustered by (guild_id, discord_id), a guild is one contiguous range
+CREATE_GUILD_RANKINGS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS guild_rankings (
+        guild_id TEXT NOT NULL,
+        discord_id TEXT NOT NULL,
         rank TEXT,
         tier INTEGER,
         points INTEGER DEFAULT 0,
         games_played INTEGER DEFAULT 0,
         last_game_date TEXT,
-        shadow_mmr REAL DEFAULT 0.5
-    )
+        shadow_mmr REAL DEFAULT 0.5,
+        PRIMARY KEY (guild_id, discord_id)
+    ) WITHOUT ROWID
 '''
 
-# Retrieves basic ranking data for all players
-# Returns: List of (discord_id, rank, tier, points, shadow_mmr)
-GET_PLAYERS = '''
-    SELECT discord_id, rank, tier, points, shadow_mmr 
+# Covering index of a guild leaderboard (WHERE guild_id = ? ORDER BY points DESC), no table lookup needed
+CREATE_GUILD_POINTS_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_guild_rankings_points
+    ON guild_rankings (guild_id, points DESC, discord_id)
+'''
+
+# Checks whether a table exists, for the migrations
+# Parameters:
+# 1: table name
+TABLE_EXISTS = '''
+    SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?
+'''
+
+# Copies the global rankings into the legacy partition, before renaming the old table
+# Idempotent, an interrupted migration runs again on the next start
+MIGRATE_PLAYER_RANKINGS = '''
+    INSERT OR IGNORE INTO guild_rankings
+    (guild_id, discord_id, rank, tier, points, games_played, last_game_date, shadow_mmr)
+    SELECT '', discord_id, rank, tier, points, games_played, last_game_date, shadow_mmr
     FROM player_rankings
 '''
 
-# Saves or updates a player's ranking data
+# Keeps the global rankings as a backup once migrated
+RENAME_PLAYER_RANKINGS = '''
+    ALTER TABLE player_rankings RENAME TO player_rankings_v1
+'''
+
+# Retrieves basic ranking data for all players of all guilds
+# Returns: List of (guild_id, discord_id, rank, tier, points, shadow_mmr, games_played)
+GET_PLAYERS = '''
+    SELECT guild_id, discord_id, rank, tier, points, shadow_mmr, games_played
+    FROM guild_rankings
+'''
+
+# Saves or updates a player's ranking data in a guild (one row of a batch)
 # Parameters:
-# 1-5: discord_id, rank, tier, points, shadow_mmr (for INSERT)
-# 6-9: rank, tier, points, shadow_mmr (for UPDATE)
-# Note: Automatically increments games_played and updates last_game_date
+# 1-7: guild_id, discord_id, rank, tier, points, games played since the last save, shadow_mmr
+# Note: games_played is incremented by the new games count and last_game_date is updated
 SAVE_PLAYER = '''
-    INSERT INTO player_rankings
-    (discord_id, rank, tier, points, last_game_date, shadow_mmr)
-    VALUES (?, ?, ?, ?, DATETIME('now'), ?)
-    ON CONFLICT(discord_id) DO UPDATE SET
-        rank = ?,
-        tier = ?,
-        points = ?,
-        games_played = games_played + 1,
+    INSERT INTO guild_rankings
+    (guild_id, discord_id, rank, tier, points, games_played, last_game_date, shadow_mmr)
+    VALUES (?, ?, ?, ?, ?, ?, DATETIME('now'), ?)
+    ON CONFLICT(guild_id, discord_id) DO UPDATE SET
+        rank = excluded.rank,
+        tier = excluded.tier,
+        points = excluded.points,
+        games_played = games_played + excluded.games_played,
         last_game_date = DATETIME('now'),
-        shadow_mmr = ?
+        shadow_mmr = excluded.shadow_mmr
 '''
 
-# Gets a player's position in the global rankings
+# Moves a player's legacy ranking and games to the first guild they play in (one row of a batch)
 # Parameters:
-# 1: discord_id
-# Returns: Player's position (1-based ranking)
-GET_PLAYER_RANK = '''
-    SELECT COUNT(*) + 1 FROM player_rankings
-    WHERE points > (
-        SELECT points FROM player_rankings WHERE discord_id = ?
+# 1: guild_id
+# 2: discord_id
+ADOPT_LEGACY_PLAYER = '''
+    UPDATE guild_rankings SET guild_id = ? WHERE guild_id = '' AND discord_id = ?
+'''
+ADOPT_LEGACY_GAMES = '''
+    UPDATE games SET guild_id = ? WHERE guild_id = '' AND discord_id = ?
+'''
+
+# Query to create the append-only history of finished games
+# Fields:
+# - id: Insertion order, also the replay order
+# - guild_id: Discord ID of the guild the game was played in ('' for games played before per-guild rankings)
+# - discord_id: Player's Discord ID
+# - word: Mystery word
+# - mode: Game mode (ranked, unranked ...)
+# - attempts: Number of attempts made
+# - duration: Time taken to find the word, in seconds
+# - difficulty: Word difficulty rating (1-5)
+# - accuracy: Percentage of correct guesses (0.0-1.0)
+# - played_at: Timestamp of the end of the game
+CREATE_GAMES_TABLE = '''
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id TEXT NOT NULL DEFAULT '',
+        discord_id TEXT NOT NULL,
+        word TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        duration REAL NOT NULL,
+        difficulty REAL NOT NULL,
+        accuracy REAL NOT NULL,
+        played_at TEXT DEFAULT (DATETIME('now'))
     )
 '''
 
-# Retrieves players ranked near a target player
+# Adds the guild column to a games table created before per-guild rankings
+ADD_GAMES_GUILD_COLUMN = '''
+    ALTER TABLE games ADD COLUMN guild_id TEXT NOT NULL DEFAULT ''
+'''
+
+# Index of a player's games in a guild, in play order
+CREATE_GAMES_PLAYER_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_games_guild_player
+    ON games (guild_id, discord_id, id)
+'''
+
+# Drops the index of the global games history, replaced by idx_games_guild_player
+DROP_GAMES_LEGACY_INDEX = '''
+    DROP INDEX IF EXISTS idx_games_player
+'''
+
+# Appends a finished game (one row of a batch)
 # Parameters:
-# 1: discord_id - Target player's Discord ID
-# 2: Range before target rank
-# 3: Range after target rank
-# Returns: List of (rank, discord_id, grade, tier, points) for nearby players
-GET_NEARBY_PLAYERS = '''
-    WITH player_rank AS (
-        SELECT
-            ROW_NUMBER() OVER (ORDER BY points DESC) as rank,
-            discord_id,
-            rank as grade,
-            tier,
-            points
-        FROM player_rankings
-    ),
-    target_rank AS (
-        SELECT rank
-        FROM player_rank
-        WHERE discord_id = ?
-    )
-    SELECT
-        rank,
-        discord_id,
-        grade,
-        tier,
-        points
-    FROM player_rank
-    WHERE rank BETWEEN (SELECT rank FROM target_rank) - ?
-                    AND (SELECT rank FROM target_rank) + ?
-    ORDER BY rank
+# 1-8: guild_id, discord_id, word, mode, attempts, duration, difficulty, accuracy
+INSERT_GAME = '''
+    INSERT INTO games
+    (guild_id, discord_id, word, mode, attempts, duration, difficulty, accuracy)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
 '''
 
-# Retrieves the top N players by points
+# Retrieves every game of a mode in play order, for the ranking replay
 # Parameters:
-# 1: limit - Number of top players to return
-# Returns: List of (discord_id, rank, tier, points) for top players
-GET_TOP_PLAYERS = '''
-    SELECT
-        discord_id,
-        rank,
-        tier,
-        points
-    FROM player_rankings
-    ORDER BY points DESC
-    LIMIT ?
-''' 
\ No newline at end of file
+# 1: mode
+# Returns: List of (guild_id, discord_id, attempts, duration, difficulty, accuracy)
+GET_GAMES_BY_MODE = '''
+    SELECT guild_id, discord_id, attempts, duration, difficulty, accuracy
+    FROM games
+    WHERE mode = ?
+    ORDER BY id
+'''
+
+# Overwrites a player's replayed ranking data in a guild
+# Parameters:
+# 1-4: rank, tier, points, shadow_mmr
+# 5-6: guild_id, discord_id
+SET_PLAYER_RANKING = '''
+    UPDATE guild_rankings
+    SET rank = ?, tier = ?, points = ?, shadow_mmr = ?
+    WHERE guild_id = ? AND discord_id = ?
+'''
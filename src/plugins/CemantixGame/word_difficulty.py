@@ -0,0 +1,98 @@
+"""Module related to the word difficulty of the Cemantix game plugin. Rates every mystery word from the shape of its embedding neighbourhood."""
+
+from pathlib import Path
+
+import numpy as np
+
+from embedding_store import STORE_DIR
+
+DIFFICULTY_FILE = "difficulty.npy"
+
+# Rating given when a word has no precomputed difficulty (median of the 1-5 scale)
+DEFAULT_DIFFICULTY = 3.0
+
+# Closest words averaged for the neighbour density
+NEIGHBOURS = 10
+
+# Share of each feature in the rating, they add up to 1
+DENSITY_WEIGHT = 0.4  # Sparse neighbourhood: few warm words to climb through
+SPREAD_WEIGHT = 0.3  # Flat similarity distribution: guesses say little about the target
+FREQUENCY_WEIGHT = 0.3  # Rare word: players rarely think of it
+
+# Mystery words scored per matrix product, bounds the (batch, vocabulary) float32 buffer
+BATCH_SIZE = 512
+
+
+def _percentiles(values: np.ndarray) -> np.ndarray:
+    """Rank-based percentile (0.0 - 1.0) of each value within the array."""
+    if len(values) < 2:
+        return np.zeros(len(values))
+    order = np.argsort(values, kind="stable")
+    percentiles = np.empty(len(values))
+    percentiles[order] = np.arange(len(values)) / (len(values) - 1)
+    return percentiles
+
+
+def compute_difficulties(store, words: list) -> np.ndarray:
+    """
+    Rate the difficulty of words against the whole vocabulary.
+
+    Each word gets three features from its similarity row: the mean similarity
+    of its closest neighbours, the spread of its similarities and its frequency
+    rank (the store keeps the model frequency order). Features are turned into
+    percentiles within `words`, weighted, and mapped to the 1-5 scale used by
+    RankingConfig.
+
+    Args:
+        store: EmbeddingStore holding the normalized vectors
+        words: Words to rate, all present in the store
+
+    Returns:
+        np.ndarray: float16 rating per store index, NaN for the words not rated
+    """
+    rows = np.array([store.index[word] for word in words], dtype=np.int64)
+    vocabulary = len(store)
+    density = np.empty(len(rows))
+    spread = np.empty(len(rows))
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        similarities = np.ascontiguousarray(store.dot(store.rows(batch).T).T)
+        spread[start:start + len(batch)] = similarities.std(axis=1)
+
+        # The word itself must not count as its own neighbour
+        similarities[np.arange(len(batch)), batch] = -1.0
+        closest = np.partition(similarities, vocabulary - NEIGHBOURS, axis=1)[:, -NEIGHBOURS:]
+        density[start:start + len(batch)] = closest.mean(axis=1)
+
+    hardness = (
+        DENSITY_WEIGHT * _percentiles(-density)
+        + SPREAD_WEIGHT * _percentiles(-spread)
+        + FREQUENCY_WEIGHT * _percentiles(rows.astype(np.float64))
+    )
+
+    difficulties = np.full(vocabulary, np.nan, dtype=np.float16)
+    difficulties[rows] = 1 + 4 * hardness
+    return difficulties
+
+
+def save_difficulties(difficulties: np.ndarray, store_dir: Path = STORE_DIR):
+    """Write the ratings next to the embedding store they index."""
+    store_dir.mkdir(parents=True, exist_ok=True)
+    np.save(store_dir / DIFFICULTY_FILE, difficulties)
+
+
+def load_difficulties(store, store_dir: Path = STORE_DIR):
+    """
+    Load the ratings written by save_difficulties().
+
+    Returns:
+        np.ndarray: Rating per store index, or None if missing or built for another store
+    """
+    path = store_dir / DIFFICULTY_FILE
+    if not path.exists():
+        return None
+    difficulties = np.load(path)
+    if len(difficulties) != len(store):
+        return None
+    return difficulties
@@ -0,0 +1,149 @@
+"""Module related to the player input of the Cemantix game plugin. Maps accent-less and inflected spellings to dictionary words."""
+
+import re
+import unicodedata
+
+# Separators between the words of a message proposing several guesses
+_SEPARATORS = re.compile(r"[\s,;/|]+")
+
+# Ligatures that NFD does not decompose
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae"})
+
+# Suffix rewrites tried in order on keys missing from the index: (suffix, replacement)
+# Keys are accent-less, so "ère" is written "ere"
+INFLECTIONS = (
+    ("eaux", "eau"),  # bateaux -> bateau
+    ("aux", "al"),  # chevaux -> cheval
+    ("aux", "ail"),  # travaux -> travail
+    ("x", ""),  # jeux -> jeu
+    ("s", ""),  # maisons -> maison
+    ("euse", "eur"),  # chanteuse -> chanteur
+    ("trice", "teur"),  # actrice -> acteur
+    ("ive", "if"),  # sportive -> sportif
+    ("ere", "er"),  # boulangère -> boulanger
+    ("enne", "en"),  # chienne -> chien
+    ("onne", "on"),  # lionne -> lion
+    ("elle", "el"),  # cruelle -> cruel
+    ("e", ""),  # grande -> grand
+)
+
+
+def normalize(word: str) -> str:
+    """Lowercase a word and strip its accents and ligatures ("Éléphant" -> "elephant")."""
+    word = word.strip().lower()
+    if word.isascii():
+        return word
+    decomposed = unicodedata.normalize("NFD", word.translate(_LIGATURES))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def split_words(text: str) -> list:
+    """Split a message into its words, in order, without duplicates ("chat, chien chat" -> ["chat", "chien"])."""
+    return list(dict.fromkeys(word for word in _SEPARATORS.split(text.strip().lower()) if word))
+
+
+def _rewrites(key: str) -> list:
+    return [
+        key[: -len(suffix)] + replacement
+        for suffix, replacement in INFLECTIONS
+        if key.endswith(suffix) and len(key) > len(suffix) + 1
+    ]
+
+
+def lemma_keys(key: str) -> list:
+    """Candidate base forms of a normalized key, most likely first."""
+    candidates = []
+    for candidate in _rewrites(key):
+        candidates.append(candidate)
+        # A feminine plural needs a second rewrite (grandes -> grande -> grand)
+        if not key.endswith(("s", "x")) or candidate.endswith(("s", "x")):
+            continue
+        candidates.extend(_rewrites(candidate))
+    return list(dict.fromkeys(candidates))
+
+
+class WordIndex:
+    """
+    Frozen lookup from what a player types to a dictionary word.
+
+    Exact dictionary words are a frozenset membership test. Only the words
+    whose normalized key differs from themselves take a slot in the key map,
+    which holds references to the dictionary strings, not copies. A lookup is
+    one exact test, one key probe and at most a handful of suffix probes, so
+    it stays O(1) whatever the dictionary size.
+    """
+
+    __slots__ = ("_words", "_keys")
+
+    def __init__(self, words, priority=None):
+        """
+        Args:
+            words: Dictionary words
+            priority: Optional; Function giving a sort key per word, the lowest wins
+                      when several words share a normalized key (e.g. "pâte" and "pâté")
+        """
+        self._words = frozenset(words)
+        keys = {}
+        for word in sorted(self._words, key=priority) if priority else sorted(self._words):
+            keys.setdefault(normalize(word), word)
+        # Keys that are dictionary words themselves are answered by the exact test
+        self._keys = {key: word for key, word in keys.items() if key not in self._words}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by save(), without normalizing any word again.
+
+        Args:
+            path: Path of the index file
+
+        Returns:
+            WordIndex: The index
+        """
+        index = cls.__new__(cls)
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.split("\t") for line in f.read().splitlines()]
+        index._words = frozenset(line[0] for line in lines)
+        index._keys = {line[1]: line[0] for line in lines if len(line) > 1}
+        return index
+
+    def save(self, path):
+        """Write the index, one word per line followed by the normalized key it owns if any."""
+        owners = {word: key for key, word in self._keys.items()}
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(
+                f"{word}\t{owners[word]}" if word in owners else word for word in sorted(self._words)
+            ))
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        return word in self._words
+
+    def resolve(self, text: str):
+        """
+        Get the dictionary word a player meant.
+
+        Args:
+            text: Raw player input
+
+        Returns:
+            str: The canonical dictionary word, or None if nothing matches
+        """
+        word = text.strip().lower()
+        if word in self._words:
+            return word
+
+        key = normalize(word)
+        found = self._lookup(key)
+        if found is not None:
+            return found
+        for candidate in lemma_keys(key):
+            found = self._lookup(candidate)
+            if found is not None:
+                return found
+        return None
+
+    def _lookup(self, key: str):
+        return key if key in self._words else self._keys.get(key)
@@ -11,6 +11,7 @@ import yt_dlp
 from discord import app_commands
 from discord.ext import commands
 
+from core.edit_coalescer import EditCoalescer
 from streaming import AudioManager
 from player_view import MusicControlButtons
 
@@ -32,10 +33,12 @@ class MusicPlayer(commands.Cog):
         self.audio_manager = AudioManager(bot)
         self.playlist = deque()  # File d'attente pour les URLs
         self.info_message = None  # Message d'information qui sera mis à jour
+        self.edits = EditCoalescer.for_bot(bot)  # Fusionne les mises à jour rapprochées du statut
 
     async def delete_info_message(self):
         """Delete the current info message if it exists."""
         if self.info_message:
+            self.edits.discard(self.info_message)
             try:
                 await self.info_message.delete()
             except discord.NotFound:
@@ -53,7 +56,9 @@ class MusicPlayer(commands.Cog):
         """
         if self.info_message:
             try:
-                await self.info_message.edit(content=f"Statut du lecteur : {content}")
+                await self.edits.edit(
+                    self.info_message, content=f"Statut du lecteur : {content}"
+                )
             except discord.NotFound:
                 self.info_message = await interaction.channel.send(
                     f"Statut du lecteur : {content}"